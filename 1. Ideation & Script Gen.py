@@ -1,4 +1,7 @@
+import argparse
+import importlib.util
 import os
+import random
 import textwrap
 from pathlib import Path
 from slugify import slugify
@@ -6,44 +9,93 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-try:
-    import openai
-except Exception:
+if importlib.util.find_spec("openai") is None:
     raise SystemExit("openai package not installed")
 
+import api_cache
+from replies import parse_json, parse_list
+
 MODEL = "gpt-4o"
+CATEGORIES_PROMPT = "Suggest faceless YouTube categories about tech trends"
+PLAN_PROMPT = (
+    f"{CATEGORIES_PROMPT}, pick the most promising one, give 5 video ideas about it, "
+    "pick the best idea and write a short narration for it. Reply with a JSON object shaped like "
+    '{"categories": ["..."], "category": "...", "ideas": ["..."], "idea": "...", "script": "..."}'
+)
+PLAN_FIELDS = {"categories": list, "category": str, "ideas": list, "idea": str, "script": str}
 DATA_DIR = Path("data/inputs")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def chat(prompt: str, temperature: float = 0.8) -> str:
-    resp = openai.chat.completions.create(
-        model=MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=temperature,
-    )
-    return resp.choices[0].message.content.strip()
-
-
-def main():
-    cats = [c.strip() for c in chat("Suggest faceless YouTube categories about tech trends", 0.6).splitlines() if c.strip()]
-    for i, c in enumerate(cats, 1):
-        print(f"{i}. {c}")
-    category = cats[int(input("Pick a category number: ")) - 1]
-
-    ideas = [i.strip() for i in chat(f"Give 5 video ideas about {category}").splitlines() if i.strip()]
-    for i, idea in enumerate(ideas, 1):
-        print(f"{i}. {idea}")
-    idea = ideas[int(input("Pick an idea number: ")) - 1]
-
-    script = chat(f"Write a short narration for: {idea}")
+    return api_cache.chat(MODEL, [{"role": "user", "content": prompt}], temperature=temperature)
+
+
+def save_script(idea: str, script: str, out_dir: str | Path | None = None) -> Path:
+    out_dir = Path(out_dir or DATA_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
     print("\n--- Script ---\n")
     print(textwrap.fill(script, 80))
 
-    filename = DATA_DIR / f"{slugify(idea)[:50]}.txt"
+    filename = out_dir / f"{slugify(idea)[:50]}.txt"
     filename.write_text(script, encoding="utf-8")
     print("Saved", filename)
+    return filename
+
+
+def write_script(idea: str, out_dir: str | Path | None = None) -> Path:
+    """Write the narration for ``idea`` to ``out_dir`` (``data/inputs`` by default)."""
+    return save_script(idea, chat(f"Write a short narration for: {idea}"), out_dir)
+
+
+def plan_video(seed: int | None = None) -> dict | None:
+    """Categories, ideas, the picks among them and the script, from one JSON-mode call.
+
+    ``seed`` is passed to the model and is part of the cache key, so each
+    run draws a new plan unless a seed is given to repeat one. Returns
+    None when the model won't answer in JSON or the reply is missing a
+    field, so the caller can fall back to separate calls.
+    """
+    import openai
+
+    if seed is None:
+        seed = random.randrange(2**31)
+    try:
+        reply = api_cache.chat(
+            MODEL, [{"role": "user", "content": PLAN_PROMPT}],
+            check=lambda r: parse_json(r, PLAN_FIELDS),
+            temperature=0.8, seed=seed, response_format={"type": "json_object"},
+        )
+    except (ValueError, openai.BadRequestError) as exc:
+        print(f"Structured reply unusable ({exc}); asking step by step instead")
+        return None
+    return parse_json(reply, PLAN_FIELDS)
+
+
+def pick(options: list[str], prompt: str, auto: bool) -> str:
+    for i, option in enumerate(options, 1):
+        print(f"{i}. {option}")
+    return options[0] if auto else options[int(input(prompt)) - 1]
+
+
+def main(out_dir: str | Path | None = None, auto: bool = False, seed: int | None = None):
+    """Write a script for an idea picked by the user, or with ``auto`` by the model in one call."""
+    if auto:
+        plan = plan_video(seed)
+        if plan:
+            print("Category:", plan["category"])
+            print("Idea:", plan["idea"])
+            return save_script(plan["idea"], plan["script"], out_dir)
+
+    category = pick(parse_list(chat(CATEGORIES_PROMPT, 0.6)), "Pick a category number: ", auto)
+    idea = pick(parse_list(chat(f"Give 5 video ideas about {category}")), "Pick an idea number: ", auto)
+    return write_script(idea, out_dir)
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Pick a video idea and write its script")
+    parser.add_argument("--auto", action="store_true", help="Let the model pick the category and idea, in one call")
+    parser.add_argument("--seed", type=int, default=None, help="Repeat the --auto plan drawn with this seed")
+    parser.add_argument("--out-dir", default=str(DATA_DIR), help="Folder to write the script to")
+    args = parser.parse_args()
+    main(args.out_dir, args.auto, args.seed)
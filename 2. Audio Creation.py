@@ -1,34 +1,52 @@
-import os
+import argparse
+import importlib.util
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
-try:
-    import openai
-except Exception:
+if importlib.util.find_spec("openai") is None:
     raise SystemExit("openai package not installed")
 
+import api_cache
+import tts
+
 AUDIO_DIR = Path("data/audio")
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def main(text_file: str):
+def main(
+    text_file: str,
+    chunked: bool = False,
+    max_in_flight: int = tts.MAX_IN_FLIGHT,
+    gap: float = 0.0,
+    out_dir: str | Path | None = None,
+):
     text = Path(text_file).read_text()
-    resp = openai.audio.speech.create(
-        model="gpt-4o-mini-tts",
-        voice="coral",
-        input=text,
-        speed=0.95,
-    )
-    out_path = AUDIO_DIR / "tts_output.mp3"
-    resp.stream_to_file(str(out_path))
+    out_dir = Path(out_dir or AUDIO_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / "tts_output.mp3"
+    if chunked:
+        tts.synthesize_chunked(
+            text,
+            out_path,
+            max_in_flight=max_in_flight,
+            gap=gap,
+            on_chunk=lambda i, n, _: print(f"Chunk {i + 1}/{n} ready"),
+        )
+    else:
+        out_path.write_bytes(api_cache.speech(tts.MODEL, tts.VOICE, text, speed=tts.SPEED))
     print("Saved", out_path)
+    return out_path
 
 
 if __name__ == "__main__":
-    import sys
-    if len(sys.argv) < 2:
-        print("Usage: python 2. Audio Creation.py <text_file>")
-        raise SystemExit(1)
-    main(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Synthesise the narration for a script")
+    parser.add_argument("text_file")
+    parser.add_argument("--chunked", action="store_true",
+                        help="Split at sentence boundaries and synthesise the chunks concurrently")
+    parser.add_argument("--workers", type=int, default=tts.MAX_IN_FLIGHT, help="Chunks synthesised at once")
+    parser.add_argument("--gap", type=float, default=0.0, help="Seconds of silence between chunks")
+    parser.add_argument("--out-dir", default=str(AUDIO_DIR), help="Folder to write the narration to")
+    args = parser.parse_args()
+    main(args.text_file, args.chunked, args.workers, args.gap, args.out_dir)
@@ -1,45 +1,53 @@
-import sys
- fl5ssl-codex/create-ui-orchestrator-for-python-scripts
-import os
-=======
- main
+import argparse
+import importlib.util
 from pathlib import Path
-import pandas as pd
 from dotenv import load_dotenv
 
 load_dotenv()
 
-try:
-    import openai
-except Exception:
+if importlib.util.find_spec("openai") is None:
     raise SystemExit("openai package not installed")
 
+import api_cache
+import stt
+from transcript import Transcript
+
 TRANS_DIR = Path("data/transcripts")
 TRANS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def main(audio_file: str):
- fl5ssl-codex/create-ui-orchestrator-for-python-scripts
-    """Transcribe ``audio_file`` using OpenAI Whisper."""
-    key = os.getenv("OPENAI_API_KEY")
-    client = openai.OpenAI(api_key=key)
-=======
-    client = openai.OpenAI()
- main
-    resp = client.audio.transcriptions.create(
-        model="whisper-1",
-        file=open(audio_file, "rb"),
-        response_format="verbose_json",
-        timestamp_granularities=["word"],
-    )
-    df = pd.DataFrame([{"word": w.word, "start": w.start, "end": w.end} for w in resp.words])
-    out_path = TRANS_DIR / "sentence_timestamps.csv"
-    df.to_csv(out_path, index=False)
-    print("Saved", out_path)
+def main(
+    audio_file: str,
+    chunked: bool = False,
+    window: float = stt.WINDOW,
+    max_in_flight: int = stt.MAX_IN_FLIGHT,
+    out_dir: str | Path | None = None,
+):
+    """Transcribe ``audio_file`` using OpenAI Whisper.
+
+    Writes the binary ``.tlx`` store used by the renderer and a CSV export
+    of the same words.
+    """
+    if chunked:
+        words = stt.transcribe_chunked(audio_file, window=window, max_in_flight=max_in_flight)
+    else:
+        words = api_cache.transcribe_words(audio_file)
+    transcript = Transcript.from_words(words)
+    out_dir = Path(out_dir or TRANS_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = transcript.save(out_dir / "sentence_timestamps.tlx")
+    csv_path = transcript.to_csv(out_dir / "sentence_timestamps.csv")
+    print("Saved", out_path, "and", csv_path)
+    return out_path
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python 3. Timestamp Transcription.py <audio_file>")
-        raise SystemExit(1)
-    main(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Transcribe narration audio with word timestamps")
+    parser.add_argument("audio_file")
+    parser.add_argument("--chunked", action="store_true",
+                        help="Split at silences into overlapping windows and transcribe them concurrently")
+    parser.add_argument("--window", type=float, default=stt.WINDOW, help="Target window length in seconds")
+    parser.add_argument("--workers", type=int, default=stt.MAX_IN_FLIGHT, help="Windows transcribed at once")
+    parser.add_argument("--out-dir", default=str(TRANS_DIR), help="Folder to write the transcript to")
+    args = parser.parse_args()
+    main(args.audio_file, args.chunked, args.window, args.workers, args.out_dir)
@@ -1,47 +1,47 @@
+import importlib.util
 import sys
-import zipfile
-import requests
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
-try:
-    import openai
-except Exception:
+if importlib.util.find_spec("openai") is None:
     raise SystemExit("openai package not installed")
 
+from storyboard import FORMATS, MAX_IN_FLIGHT, generate_storyboard
+
 IMAGE_DIR = Path("data/images")
 IMAGE_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def main(script_path: str, n_images: int = 5):
+def main(
+    script_path: str,
+    n_images: int = 5,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    out_dir: str | Path | None = None,
+    image_format: str = "png",
+):
     script_text = Path(script_path).read_text()
-    img_paths = []
-    for i in range(n_images):
-        prompt = f"{script_text}\nScene {i+1}"
-        resp = openai.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            n=1,
-            size="1024x1024",
-        )
-        url = resp.data[0].url
-        img_data = requests.get(url).content
-        img_path = IMAGE_DIR / f"scene_{i+1:03d}.png"
-        img_path.write_bytes(img_data)
-        img_paths.append(img_path)
-        print("Saved", img_path)
-    zip_path = IMAGE_DIR / "images.zip"
-    with zipfile.ZipFile(zip_path, "w") as z:
-        for p in img_paths:
-            z.write(p, p.name)
+    out_dir = Path(out_dir or IMAGE_DIR)
+    zip_path = out_dir / "images.zip"
+    generate_storyboard(
+        script_text,
+        n_images,
+        out_dir,
+        max_in_flight=max_in_flight,
+        on_saved=lambda m: print("Saved", m.name),
+        archive=zip_path,
+        image_format=image_format,
+    )
     print("ZIP saved", zip_path)
+    return zip_path
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python 4. Storyboard Creation.py <script_path> [num_images]")
+        print(f"Usage: python 4. Storyboard Creation.py <script_path> [num_images] [max_in_flight] [{'|'.join(FORMATS)}]")
         raise SystemExit(1)
     n = int(sys.argv[2]) if len(sys.argv) > 2 else 5
-    main(sys.argv[1], n)
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else MAX_IN_FLIGHT
+    image_format = sys.argv[4] if len(sys.argv) > 4 else "png"
+    main(sys.argv[1], n, workers, image_format=image_format)
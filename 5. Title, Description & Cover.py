@@ -1,55 +1,92 @@
+import importlib.util
 import sys
-import requests
 from pathlib import Path
 from slugify import slugify
 from dotenv import load_dotenv
 
 load_dotenv()
 
-try:
-    import openai
-except Exception:
+if importlib.util.find_spec("openai") is None:
     raise SystemExit("openai package not installed")
 
+import api_cache
+from replies import parse_json, parse_list
+
+MODEL = "gpt-4o-mini"
 FINAL_DIR = Path("data/final")
 FINAL_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def main(script_path: str):
-    script = Path(script_path).read_text()
-    resp = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": f"Suggest 5 catchy titles for: {script}"}],
+def suggest(script: str, choice: int) -> tuple[list[str], str] | None:
+    """Titles for ``script`` and the description for title number ``choice``, from one JSON-mode call.
+
+    Returns None when the reply doesn't validate, so the caller can ask separately.
+    """
+    import openai
+
+    prompt = (
+        f"Suggest 5 catchy titles for the video script below and write a YouTube description for "
+        f"title number {choice}. Reply with a JSON object shaped like "
+        f'{{"titles": ["..."], "description": "..."}}\n\n{script}'
     )
-    titles = [t.strip() for t in resp.choices[0].message.content.splitlines() if t.strip()]
+
+    def parse(reply: str) -> dict:
+        parsed = parse_json(reply, {"titles": list, "description": str})
+        if len(parsed["titles"]) < choice:
+            raise ValueError(f"only {len(parsed['titles'])} titles, wanted number {choice}")
+        return parsed
+
+    try:
+        reply = api_cache.chat(
+            MODEL, [{"role": "user", "content": prompt}], check=parse, response_format={"type": "json_object"}
+        )
+    except (ValueError, openai.BadRequestError) as exc:
+        print(f"Structured reply unusable ({exc}); asking for titles and description separately")
+        return None
+    parsed = parse(reply)
+    return parsed["titles"], parsed["description"]
+
+
+def main(script_path: str, out_dir: str | Path | None = None, choice: int | None = None):
+    """Write title, description and cover to ``out_dir``.
+
+    ``choice`` picks a suggested title by number instead of prompting for
+    one, which lets the titles and description come from a single call.
+    """
+    script = Path(script_path).read_text()
+    suggested = suggest(script, choice) if choice is not None else None
+    if suggested:
+        titles, description = suggested
+    else:
+        titles = parse_list(
+            api_cache.chat(MODEL, [{"role": "user", "content": f"Suggest 5 catchy titles for: {script}"}])
+        )
     for i, t in enumerate(titles, 1):
         print(f"{i}. {t}")
-    title = titles[int(input("Choose title number: ")) - 1]
+    if choice is None:
+        choice = int(input("Choose title number: "))
+    title = titles[min(choice, len(titles)) - 1]
 
-    desc_resp = openai.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": f"Write a YouTube description for the video titled: {title}"}],
-    )
-    description = desc_resp.choices[0].message.content.strip()
+    if not suggested:
+        description = api_cache.chat(
+            MODEL,
+            [{"role": "user", "content": f"Write a YouTube description for the video titled: {title}"}],
+        )
 
-    (FINAL_DIR / "title.txt").write_text(title)
-    (FINAL_DIR / "description.txt").write_text(description)
+    out_dir = Path(out_dir or FINAL_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "title.txt").write_text(title)
+    (out_dir / "description.txt").write_text(description)
 
-    img_resp = openai.images.generate(
-        model="dall-e-3",
-        prompt=f"YouTube thumbnail for {title}",
-        n=1,
-        size="1024x1024",
-    )
-    img_url = img_resp.data[0].url
-    img_data = requests.get(img_url).content
-    img_path = FINAL_DIR / "cover.png"
+    img_data = api_cache.image(f"YouTube thumbnail for {title}")
+    img_path = out_dir / "cover.png"
     img_path.write_bytes(img_data)
-    print("Saved metadata in", FINAL_DIR)
+    print("Saved metadata in", out_dir)
+    return out_dir
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python 5. Title, Description & Cover.py <script_path>")
+        print("Usage: python 5. Title, Description & Cover.py <script_path> [title_number]")
         raise SystemExit(1)
-    main(sys.argv[1])
+    main(sys.argv[1], choice=int(sys.argv[2]) if len(sys.argv) > 2 else None)
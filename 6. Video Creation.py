@@ -1,57 +1,121 @@
-import sys
-import zipfile
-import shutil
-from uuid import uuid4
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 
-load_dotenv()
+from captions import WORDS_PER_LINE, CaptionStyle, write_captions
+from frames import zip_members
+from motion import PRESETS, plan_motion
+from render import PROFILES, RENDERERS, SCENE_DURATION, probe_duration, render
+from transitions import KINDS, SECONDS, plan_transitions
+from transcript import scene_durations
 
-try:
-    import moviepy.editor as mp
-except Exception:
-    raise SystemExit("moviepy package not installed")
+load_dotenv()
 
-AUDIO_DIR = Path("data/audio")
-IMAGE_DIR = Path("data/images")
 FINAL_DIR = Path("data/final")
+FINAL_DIR.mkdir(parents=True, exist_ok=True)
 
-for d in [AUDIO_DIR, IMAGE_DIR, FINAL_DIR]:
-    d.mkdir(parents=True, exist_ok=True)
-
-
-def main(audio_file: str, images_zip: str):
-    audio_path = AUDIO_DIR / "narration.mp3"
-    if Path(audio_file) != audio_path:
-        shutil.copy(audio_file, audio_path)
-
-    tmp_dir = IMAGE_DIR / f"temp_{uuid4().hex[:8]}"
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    with zipfile.ZipFile(images_zip) as z:
-        z.extractall(tmp_dir)
-
-    clips = []
-    for img_file in sorted(tmp_dir.glob("*.png")):
-        clip = mp.ImageClip(str(img_file)).resize(height=1080)
-        if clip.w > 1920:
-            clip = clip.crop(x_center=clip.w / 2, width=1920)
-        else:
-            clip = clip.resize(width=1920)
-        clips.append(clip.set_duration(3))
 
-    video = mp.concatenate_videoclips(clips, method="compose")
-    audio = mp.AudioFileClip(str(audio_path))
-    final_duration = min(video.duration, audio.duration)
-    video = video.set_audio(audio.subclip(0, final_duration)).set_duration(final_duration)
+def main(
+    audio_file: str,
+    images_zip: str,
+    transcript: str | None = None,
+    renderer: str = "moviepy",
+    workers: int | None = None,
+    segment_scenes: int | None = None,
+    captions: str | None = None,
+    words_per_line: int = WORDS_PER_LINE,
+    highlight: str = CaptionStyle.highlight_colour,
+    profile: str = "final",
+    motion: str | None = None,
+    motion_variation: float = 0.0,
+    motion_seed: int = 0,
+    transitions: str | None = None,
+    transition_seconds: float = SECONDS,
+    out_dir: str | Path | None = None,
+):
+    if captions and not transcript:
+        raise SystemExit("Captions need the step 3 transcript (--transcript)")
+    audio_path = Path(audio_file)
+    out_dir = Path(out_dir or FINAL_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
 
-    out_path = FINAL_DIR / "final_video.mp4"
-    video.write_videofile(str(out_path), fps=30, codec="libx264", audio_codec="aac")
-    shutil.rmtree(tmp_dir)
-    print("Saved final video to", out_path)
+    images = zip_members(images_zip)
+    if transcript:
+        durations = scene_durations(transcript, len(images), probe_duration(audio_path))
+    else:
+        durations = [SCENE_DURATION] * len(images)
+    subtitles = None
+    if captions:
+        style = CaptionStyle(words_per_line=words_per_line, highlight_colour=highlight)
+        subtitles = write_captions(transcript, out_dir / f"captions.{captions}", style)
+    motions = plan_motion(motion.split(","), len(images), motion_variation, motion_seed) if motion else None
+    if transitions:
+        transitions = plan_transitions(transitions.split(","), len(images), transition_seconds)
+    # Drafts get their own file so a preview never replaces the finished video.
+    out_path = out_dir / ("final_video.mp4" if profile == "final" else f"{profile}_video.mp4")
+    render(
+        renderer,
+        images,
+        durations,
+        audio_path,
+        out_path,
+        workers=workers,
+        segment_scenes=segment_scenes,
+        subtitles=subtitles,
+        profile=profile,
+        motion=motions,
+        transitions=transitions,
+    )
+    print(f"Saved {profile} video to", out_path)
+    return out_path
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python 6. Video Creation.py <audio_file> <images_zip>")
-        raise SystemExit(1)
-    main(sys.argv[1], sys.argv[2])
+    parser = argparse.ArgumentParser(description="Assemble the final video from narration and storyboard images")
+    parser.add_argument("audio_file")
+    parser.add_argument("images_zip")
+    parser.add_argument("--transcript",
+                        help="Word timestamps (.tlx or .csv) from step 3; scene lengths follow the narration")
+    parser.add_argument("--renderer", choices=RENDERERS, default="moviepy",
+                        help="moviepy composites every frame; ffmpeg encodes the stills directly; "
+                             "parallel encodes scene segments on several cores")
+    parser.add_argument("--workers", type=int, help="Segment encoders for the parallel renderer (default: CPU count)")
+    parser.add_argument("--segment-scenes", type=int, help="Scenes per segment for the parallel renderer")
+    parser.add_argument("--captions", choices=["ass", "srt"],
+                        help="Burn in captions from the transcript: ass highlights each word as it is spoken")
+    parser.add_argument("--words-per-line", type=int, default=WORDS_PER_LINE, help="Caption words shown at once")
+    parser.add_argument("--highlight", default=CaptionStyle.highlight_colour,
+                        help="RRGGBB colour of the word being spoken (ass captions)")
+    parser.add_argument("--profile", choices=PROFILES, default="final",
+                        help="draft renders a small, low frame rate preview quickly; final is full quality")
+    parser.add_argument("--motion",
+                        help="Comma-separated pan/zoom moves, cycled over the scenes: "
+                             f"random, {', '.join(PRESETS)} (ffmpeg and parallel renderers)")
+    parser.add_argument("--motion-variation", type=float, default=0.0,
+                        help="Nudge each scene's zoom and framing by up to this much, e.g. 0.05")
+    parser.add_argument("--motion-seed", type=int, default=0, help="Seed for random moves and variation")
+    parser.add_argument("--transitions",
+                        help="Comma-separated transitions between scenes, cycled, each optionally kind:seconds: "
+                             f"{', '.join(KINDS)} (ffmpeg and parallel renderers)")
+    parser.add_argument("--transition-seconds", type=float, default=SECONDS,
+                        help="Length of transitions given without their own")
+    parser.add_argument("--out-dir", default=str(FINAL_DIR), help="Folder to write the video to")
+    args = parser.parse_args()
+    main(
+        args.audio_file,
+        args.images_zip,
+        args.transcript,
+        args.renderer,
+        args.workers,
+        args.segment_scenes,
+        args.captions,
+        args.words_per_line,
+        args.highlight,
+        args.profile,
+        args.motion,
+        args.motion_variation,
+        args.motion_seed,
+        args.transitions,
+        args.transition_seconds,
+        args.out_dir,
+    )
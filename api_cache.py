@@ -0,0 +1,225 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable
+
+import api_client
+import tracing
+
+CACHE_DIR = Path(os.getenv("TLDR_CACHE_DIR", "data/cache/api"))
+MAX_BYTES = int(os.getenv("TLDR_CACHE_MAX_BYTES", str(2 * 1024**3)))
+MAX_AGE = float(os.getenv("TLDR_CACHE_MAX_AGE_DAYS", "30")) * 86400
+
+# Bypass for the current context only, such as one wizard session and the
+# tasks it starts, on top of the process-wide ``ApiCache.bypass``. Worker
+# threads see it only if they run in a copy of the submitter's context.
+bypass = ContextVar("bypass", default=False)
+
+
+def sha256_file(path: str | Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ApiCache:
+    """Content-addressed disk cache for API responses and binary artifacts.
+
+    Entries are keyed on the request kind, model, parameters and a hash of
+    the input. An entry's mtime is when it was fetched and its atime,
+    refreshed by every read, when it was last used. Entries expire
+    ``max_age`` after they were fetched however often they are read;
+    beyond that, eviction drops the least recently used ones until the
+    cache fits in ``max_bytes``. With ``bypass`` set, or the :data:`bypass`
+    context variable, lookups always miss and the fresh responses
+    overwrite what was stored.
+    """
+
+    def __init__(self, root: Path = CACHE_DIR, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE, bypass: bool = False):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, kind: str, model: str, params: dict, payload: str | bytes) -> str:
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        spec = json.dumps(
+            {"kind": kind, "model": model, "params": params, "input": hashlib.sha256(payload).hexdigest()},
+            sort_keys=True,
+        )
+        return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        data = None
+        if not (self.bypass or bypass.get()) and path.exists() and time.time() - path.stat().st_mtime <= self.max_age:
+            try:
+                data = path.read_bytes()
+                # Record the read in the atime only; the mtime keeps the entry's age.
+                os.utime(path, (time.time(), path.stat().st_mtime))
+            except FileNotFoundError:
+                data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self.evict()
+
+    def fetch(
+        self,
+        kind: str,
+        model: str,
+        params: dict,
+        payload: str | bytes,
+        produce: Callable[[], bytes],
+        check: Callable[[bytes], object] | None = None,
+    ) -> bytes:
+        """The cached response for this request, or ``produce()``'s, stored for next time.
+
+        ``check`` raises ``ValueError`` for a response that is unusable
+        (a malformed JSON reply, say): such a response is never stored,
+        and one found in the cache is fetched again.
+        """
+        key = self.key(kind, model, params, payload)
+        with tracing.span(f"api.{kind}", "api", model=model) as span:
+            data = self.get(key)
+            if data is not None and check:
+                try:
+                    check(data)
+                except ValueError:
+                    data = None
+            span.set(cached=data is not None)
+            if data is None:
+                data = produce()
+                if check:
+                    check(data)
+                self.put(key, data)
+            span.set(bytes=len(data))
+        return data
+
+    def evict(self) -> None:
+        if not self.root.exists():
+            return
+        now = time.time()
+        entries = []
+        for path in self.root.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - st.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((st.st_atime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+cache = ApiCache(bypass=os.getenv("TLDR_CACHE_BYPASS", "") not in ("", "0"))
+
+
+def set_api_key(key: str) -> None:
+    """Use ``key`` for API calls. The OpenAI client is only built once a call misses the cache."""
+    os.environ["OPENAI_API_KEY"] = key
+    api_client.reset()
+
+
+def chat(model: str, messages: list[dict], check: Callable[[str], object] | None = None, **params) -> str:
+    """The reply to ``messages``; ``check`` vets it as :meth:`ApiCache.fetch` does before it is cached."""
+    def produce() -> bytes:
+        resp = api_client.call(
+            "chat",
+            lambda client: client.chat.completions.with_raw_response.create(model=model, messages=messages, **params),
+            tokens=api_client.estimate_tokens(messages, params.get("max_tokens")),
+        )
+        if resp.usage:
+            tracing.current().set(
+                prompt_tokens=resp.usage.prompt_tokens, completion_tokens=resp.usage.completion_tokens
+            )
+        return resp.choices[0].message.content.strip().encode("utf-8")
+
+    check_bytes = (lambda data: check(data.decode("utf-8"))) if check else None
+    return cache.fetch(
+        "chat", model, params, json.dumps(messages, sort_keys=True), produce, check_bytes
+    ).decode("utf-8")
+
+
+def speech(model: str, voice: str, text: str, **params) -> bytes:
+    def produce() -> bytes:
+        tracing.current().set(chars=len(text))
+        return api_client.call(
+            "speech",
+            lambda client: client.audio.speech.with_raw_response.create(model=model, voice=voice, input=text, **params),
+        ).content
+
+    return cache.fetch("speech", model, {"voice": voice, **params}, text, produce)
+
+
+def transcribe_words(audio_file: str | Path, model: str = "whisper-1") -> list[dict]:
+    """Return Whisper word timestamps as ``{"word", "start", "end"}`` dicts."""
+
+    def produce() -> bytes:
+        # A path rather than an open file, so a retry uploads it again from the start.
+        resp = api_client.call(
+            "transcription",
+            lambda client: client.audio.transcriptions.with_raw_response.create(
+                model=model,
+                file=Path(audio_file),
+                response_format="verbose_json",
+                timestamp_granularities=["word"],
+            ),
+        )
+        words = [{"word": w.word, "start": w.start, "end": w.end} for w in resp.words]
+        return json.dumps(words).encode("utf-8")
+
+    params = {"response_format": "verbose_json", "timestamp_granularities": ["word"]}
+    return json.loads(cache.fetch("transcription", model, params, sha256_file(audio_file), produce))
+
+
+def image(prompt: str, model: str = "dall-e-3", size: str = "1024x1024") -> bytes:
+    """Generate an image and return its PNG bytes, sent inline rather than as a URL to download."""
+
+    def produce() -> bytes:
+        resp = api_client.call(
+            "image",
+            lambda client: client.images.with_raw_response.generate(
+                model=model, prompt=prompt, n=1, size=size, response_format="b64_json"
+            ),
+        )
+        tracing.current().set(images=len(resp.data))
+        return base64.b64decode(resp.data[0].b64_json)
+
+    return cache.fetch("image", model, {"size": size}, prompt, produce)
@@ -0,0 +1,265 @@
+import os
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable
+
+import tracing
+
+if TYPE_CHECKING:
+    import openai
+
+TIMEOUT = float(os.getenv("TLDR_API_TIMEOUT", "120"))
+CONNECT_TIMEOUT = 10.0
+POOL_SIZE = int(os.getenv("TLDR_API_POOL", "16"))
+MAX_IN_FLIGHT = int(os.getenv("TLDR_API_IN_FLIGHT", "8"))
+MAX_ATTEMPTS = int(os.getenv("TLDR_API_ATTEMPTS", "6"))
+BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+# Completion tokens reserved for a chat call that doesn't set max_tokens.
+COMPLETION_ALLOWANCE = 1000
+
+# Starting budgets per endpoint as (requests, tokens) per minute. They are
+# the OpenAI tier 1 limits for the models the steps use, and are replaced
+# by the limits the API reports in its x-ratelimit headers once it has
+# answered. Images send no such headers, so set TLDR_IMAGE_RPM on a
+# higher tier.
+LIMITS = {
+    "chat": (float(os.getenv("TLDR_CHAT_RPM", "500")), float(os.getenv("TLDR_CHAT_TPM", "200000"))),
+    "speech": (float(os.getenv("TLDR_SPEECH_RPM", "50")), None),
+    "transcription": (float(os.getenv("TLDR_TRANSCRIPTION_RPM", "50")), None),
+    "image": (float(os.getenv("TLDR_IMAGE_RPM", "5")), None),
+}
+
+
+class TokenBucket:
+    """``per_minute`` units a minute, in bursts of up to a minute's worth.
+
+    :meth:`reserve` takes units straight away, running into debt if need
+    be, and returns how long the caller must wait before using them, so
+    callers are served in the order they ask.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.level = per_minute
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.per_minute, self.level + (now - self._stamp) * self.per_minute / 60)
+        self._stamp = now
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            self._refill()
+            self.level -= amount
+            return max(0.0, -self.level * 60 / self.per_minute)
+
+    def adjust(self, amount: float) -> None:
+        """Charge ``amount`` more (or refund it, if negative) once the real cost is known."""
+        with self._lock:
+            self.level -= amount
+
+    def sync(self, limit: float | None, remaining: float | None) -> None:
+        """Follow the server's own view of this budget, from its rate-limit headers."""
+        with self._lock:
+            self._refill()
+            if limit:
+                self.per_minute = limit
+            if remaining is not None:
+                self.level = min(self.level, remaining)
+
+
+class AdaptiveLimit:
+    """Concurrency limit that halves on every 429 and grows by one after a full limit's worth of successes."""
+
+    def __init__(self, maximum: int):
+        self.maximum = maximum
+        self.limit = maximum
+        self.active = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self) -> "AdaptiveLimit":
+        with self._cond:
+            self._cond.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def throttled(self) -> None:
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+
+    def succeeded(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify()
+
+
+class Endpoint:
+    """Budgets, concurrency and counters shared by every call to one API endpoint."""
+
+    def __init__(self, rpm: float, tpm: float | None, max_in_flight: int = MAX_IN_FLIGHT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveLimit(max_in_flight)
+        self.counts = {"calls": 0, "retries": 0, "rate_limited": 0, "wait_seconds": 0.0}
+        self._lock = threading.Lock()
+
+    def count(self, **amounts) -> None:
+        with self._lock:
+            for k, v in amounts.items():
+                self.counts[k] += v
+
+
+endpoints = {name: Endpoint(rpm, tpm) for name, (rpm, tpm) in LIMITS.items()}
+_client = None
+_client_lock = threading.Lock()
+
+
+def client() -> "openai.OpenAI":
+    """The process-wide OpenAI client, pooling keep-alive connections across threads.
+
+    Its own retries are off; :func:`call` retries with the rate limits in view.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            import httpx
+            import openai
+
+            _client = openai.OpenAI(
+                max_retries=0,
+                timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+                http_client=openai.DefaultHttpxClient(
+                    limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+                ),
+            )
+        return _client
+
+
+def reset() -> None:
+    """Drop the client, so the next call picks up a changed API key or base URL."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+def estimate_tokens(messages: list[dict], max_tokens: int | None = None) -> int:
+    """Tokens a chat call counts against the per-minute budget: roughly 4 characters each, plus the reply."""
+    chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return chars // 4 + (max_tokens or COMPLETION_ALLOWANCE)
+
+
+def retry_after(headers) -> float | None:
+    """Seconds the server asked us to wait before trying again, if it said."""
+    if headers is None:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def sync_limits(endpoint: Endpoint, headers) -> None:
+    def number(name: str) -> float | None:
+        try:
+            return float(headers[name]) if headers.get(name) else None
+        except ValueError:
+            return None
+
+    if headers is None:
+        return
+    endpoint.requests.sync(number("x-ratelimit-limit-requests"), number("x-ratelimit-remaining-requests"))
+    if endpoint.tokens:
+        endpoint.tokens.sync(number("x-ratelimit-limit-tokens"), number("x-ratelimit-remaining-tokens"))
+
+
+def backoff(attempt: int) -> float:
+    """Seconds to wait after failed attempt number ``attempt``: exponential, capped, with full jitter."""
+    return random.uniform(0, min(MAX_BACKOFF, BACKOFF * 2 ** (attempt - 1)))
+
+
+def call(kind: str, request: Callable[["openai.OpenAI"], Any], tokens: int = 0) -> Any:
+    """Send ``request(client)`` to endpoint ``kind`` within its rate limits and return the parsed response.
+
+    ``request`` should go through ``with_raw_response`` so the rate-limit
+    headers can be read. Rate limits, server errors, timeouts and dropped
+    connections are retried up to ``MAX_ATTEMPTS`` times with jittered
+    backoff, waiting at least as long as the server asks; a 429 also
+    halves how many calls to ``kind`` run at once. ``tokens`` is the
+    estimated cost of a chat call, corrected from its reported usage.
+    """
+    import openai
+
+    endpoint = endpoints[kind]
+    span = tracing.current()
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        wait = endpoint.requests.reserve(1)
+        if endpoint.tokens and tokens:
+            wait = max(wait, endpoint.tokens.reserve(tokens))
+        if wait:
+            endpoint.count(wait_seconds=wait)
+            span.add(rate_wait_seconds=wait)
+            time.sleep(wait)
+        try:
+            with endpoint.concurrency:
+                raw = request(client())
+        except openai.APIStatusError as exc:
+            if endpoint.tokens and tokens:
+                endpoint.tokens.adjust(-tokens)
+            retryable = exc.status_code in (408, 409, 429) or exc.status_code >= 500
+            # An exhausted quota is a 429 too, but waiting won't fix it.
+            if not retryable or exc.code == "insufficient_quota" or attempt == MAX_ATTEMPTS:
+                raise
+            delay = backoff(attempt)
+            if exc.status_code == 429:
+                # The server didn't count it, so neither do we; its headers say what is left.
+                endpoint.requests.adjust(-1)
+                endpoint.concurrency.throttled()
+                endpoint.count(rate_limited=1)
+                span.add(rate_limited=1)
+                sync_limits(endpoint, exc.response.headers)
+                delay = max(delay, retry_after(exc.response.headers) or 0)
+        except openai.APIConnectionError:
+            if endpoint.tokens and tokens:
+                endpoint.tokens.adjust(-tokens)
+            if attempt == MAX_ATTEMPTS:
+                raise
+            delay = backoff(attempt)
+        else:
+            endpoint.concurrency.succeeded()
+            endpoint.count(calls=1)
+            sync_limits(endpoint, raw.headers)
+            result = raw.parse()
+            usage = getattr(result, "usage", None)
+            if endpoint.tokens and tokens and usage is not None:
+                endpoint.tokens.adjust(usage.total_tokens - tokens)
+            return result
+        endpoint.count(retries=1)
+        span.add(retries=1)
+        time.sleep(delay)
+
+
+def stats() -> dict:
+    return {
+        kind: {**e.counts, "wait_seconds": round(e.counts["wait_seconds"], 3), "in_flight_limit": e.concurrency.limit}
+        for kind, e in endpoints.items()
+    }
@@ -1,30 +1,26 @@
+import importlib.util
 import os
-import zipfile
 from pathlib import Path
-from uuid import uuid4
 import shutil
+import time
+import uuid
 
 import streamlit as st
-import pandas as pd
-import moviepy.editor as mp
-import requests
 from slugify import slugify
 from dotenv import load_dotenv
 
+from pipeline import Workspace
+from replies import parse_list
+
 load_dotenv()
 
-try:
-    import openai
-except Exception:
-    openai = None
+# Streamlit re-runs this script on every interaction, so heavy modules are
+# imported inside the steps that use them. The OpenAI client itself is only
+# loaded by api_cache when a request misses the cache.
+if importlib.util.find_spec("openai"):
+    import api_cache
 else:
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    if "OPENAI_API_KEY" in st.secrets:
-        OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
-    if "OPENAI_API_KEY" in st.session_state:
-        OPENAI_API_KEY = st.session_state["OPENAI_API_KEY"]
-    if OPENAI_API_KEY:
-        openai.api_key = OPENAI_API_KEY
+    api_cache = None
 
 
 def get_key():
@@ -33,42 +29,171 @@ def get_key():
         key = st.secrets.get("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY"))
     return key
 
-if openai:
+if api_cache:
     key = get_key()
     if key:
-        openai.api_key = key
+        api_cache.set_api_key(key)
 
+SESSIONS_DIR = Path("data/sessions")
+SESSION_MAX_AGE = float(os.getenv("TLDR_SESSION_MAX_AGE_HOURS", "24")) * 3600
+UPLOAD_CHUNK = 1 << 20
 
-def get_key():
-    key = st.session_state.get("OPENAI_API_KEY")
-    if not key:
-        key = st.secrets.get("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY"))
-    return key
 
-if openai:
-    key = get_key()
-    if key:
-        openai.api_key = key
+def prune_sessions(max_age: float = SESSION_MAX_AGE) -> None:
+    """Delete the folders of sessions nobody has used for ``max_age`` seconds."""
+    if not SESSIONS_DIR.exists():
+        return
+    now = time.time()
+    for path in SESSIONS_DIR.iterdir():
+        try:
+            idle = now - path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if path.is_dir() and idle > max_age:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def workspace() -> Workspace:
+    """This browser session's own folders, so sessions sharing the worker pool never overwrite each other's files.
+
+    Every call marks the folder as used. Starting a new session prunes
+    the folders of sessions idle for longer than ``SESSION_MAX_AGE``, so
+    session folders only pile up while their sessions are in use.
+    """
+    if "session_dir" not in st.session_state:
+        prune_sessions()
+        st.session_state["session_dir"] = str(SESSIONS_DIR / uuid.uuid4().hex[:12])
+    ws = Workspace(Path(st.session_state["session_dir"])).create()
+    os.utime(ws.root)
+    return ws
+
+
+# Long steps run on a worker pool that outlives script reruns, so widget
+# interaction never interrupts them; the page polls for their progress.
+@st.cache_resource
+def background_pool():
+    from background import BackgroundPool
+
+    return BackgroundPool()
+
+
+def save_upload(upload, path: Path) -> Path:
+    """Copy an uploaded file to ``path`` in fixed-size chunks rather than reading it whole."""
+    upload.seek(0)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(upload, f, UPLOAD_CHUNK)
+    return path
+
+
+def current_task(key: str):
+    task_id = st.session_state.get(key)
+    return background_pool().get(task_id) if task_id else None
+
+
+@st.fragment(run_every=1.0)
+def poll_task(key: str):
+    task = current_task(key)
+    if task is None or task.finished:
+        st.rerun()
+    st.progress(task.fraction, task.status())
+
+
+def task_result(key: str):
+    """Result of this session's ``key`` task once it has finished; shows its progress until then."""
+    task = current_task(key)
+    if task is None:
+        return None
+    if not task.finished:
+        poll_task(key)
+        return None
+    if task.error:
+        st.error(f"{task.label} failed: {task.error}")
+        return None
+    return task.result
+
+
+def transcribe(path: Path, chunked: bool, ws: Workspace, progress):
+    from transcript import Transcript
+
+    if chunked:
+        import stt
+
+        words = stt.transcribe_chunked(path, on_window=lambda i, n: progress(i, n, f"Window {i} of {n}"))
+    else:
+        progress(0, 1, "Transcribing")
+        words = api_cache.transcribe_words(path)
+    transcript = Transcript.from_words(words)
+    tlx_path = transcript.save(ws.transcripts / "sentence_timestamps.tlx")
+    csv_path = transcript.to_csv(ws.transcripts / "sentence_timestamps.csv")
+    return words[:5], tlx_path, csv_path
+
+
+def build_storyboard(script_text: str, n_images: int, max_in_flight: int, image_format: str, ws: Workspace, progress):
+    from storyboard import generate_storyboard
 
-DATA_DIR = Path("data")
-INPUT_DIR = DATA_DIR / "inputs"
-AUDIO_DIR = DATA_DIR / "audio"
-TRANSCRIPT_DIR = DATA_DIR / "transcripts"
-IMAGE_DIR = DATA_DIR / "images"
-FINAL_DIR = DATA_DIR / "final"
+    saved = []
 
-for d in [INPUT_DIR, AUDIO_DIR, TRANSCRIPT_DIR, IMAGE_DIR, FINAL_DIR]:
-    d.mkdir(parents=True, exist_ok=True)
+    def on_saved(member):
+        saved.append(member)
+        progress(len(saved), n_images, f"Scene {len(saved)} of {n_images}")
+
+    zip_path = ws.images / "images.zip"
+    images = generate_storyboard(
+        script_text, n_images, ws.images,
+        max_in_flight=max_in_flight,
+        on_saved=on_saved,
+        archive=zip_path,
+        image_format=image_format,
+    )
+    return images, zip_path
+
+
+def assemble(
+    audio_path: Path, zip_path: Path, renderer: str, workers, transcript_path, align, caption_style, profile, motion,
+    motion_variation, transitions, transition_seconds, ws, progress,
+):
+    from captions import write_captions
+    from frames import zip_members
+    from motion import plan_motion
+    from render import SCENE_DURATION, probe_duration, render
+    from transcript import scene_durations
+    from transitions import plan_transitions
+
+    images = zip_members(zip_path)
+    if align and transcript_path:
+        durations = scene_durations(transcript_path, len(images), probe_duration(audio_path))
+    else:
+        durations = [SCENE_DURATION] * len(images)
+    subtitles = None
+    if caption_style:
+        subtitles = write_captions(transcript_path, ws.final / "captions.ass", caption_style)
+    out_path = ws.final / ("final_video.mp4" if profile == "final" else f"{profile}_video.mp4")
+    render(
+        renderer, images, durations, audio_path, out_path,
+        workers=workers,
+        subtitles=subtitles,
+        on_progress=lambda done, total: progress(done, total, f"Frame {done} of {total}"),
+        profile=profile,
+        motion=plan_motion(motion, len(images), motion_variation, seed=0) if motion else None,
+        transitions=plan_transitions(transitions, len(images), transition_seconds) if transitions else None,
+    )
+    return out_path
 
 st.title("TL;DR Studios Wizard")
 
-if openai and not openai.api_key:
+if api_cache and not os.getenv("OPENAI_API_KEY"):
     st.sidebar.warning("Enter your OpenAI API key to enable API features.")
     key_input = st.sidebar.text_input("OpenAI API Key", type="password")
     if key_input:
-        openai.api_key = key_input
+        api_cache.set_api_key(key_input)
         st.session_state["OPENAI_API_KEY"] = key_input
 
+if api_cache:
+    # Set for this session's script run only; tasks it starts take a copy.
+    api_cache.bypass.set(
+        st.sidebar.checkbox("Bypass API cache", help="Ignore cached API responses and fetch fresh ones.")
+    )
+
 step = st.sidebar.radio(
     "Step",
     [
@@ -84,7 +209,7 @@ step = st.sidebar.radio(
 # ----------------------------- Step 1 ---------------------------------
 if step.startswith("1"):
     st.header("Step 1: Ideation & Script Generation")
-    if not openai:
+    if not api_cache:
         st.error("openai package not available. Install dependencies.")
     else:
         category_prompt = st.text_input(
@@ -92,39 +217,29 @@ if step.startswith("1"):
             "Suggest faceless YouTube categories about tech trends",
         )
         if st.button("Generate Categories"):
-            resp = openai.chat.completions.create(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": category_prompt}],
-            )
-            cats = [c.strip() for c in resp.choices[0].message.content.splitlines() if c.strip()]
+            reply = api_cache.chat("gpt-4o", [{"role": "user", "content": category_prompt}])
+            cats = parse_list(reply)
             st.session_state["categories"] = cats
         cats = st.session_state.get("categories")
         if cats:
             category = st.selectbox("Choose category", cats)
             idea_prompt = st.text_input("Prompt for ideas", f"Give 5 video ideas about {category}")
             if st.button("Generate Ideas"):
-                resp = openai.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{"role": "user", "content": idea_prompt}],
-                )
-                ideas = [i.strip() for i in resp.choices[0].message.content.splitlines() if i.strip()]
+                reply = api_cache.chat("gpt-4o", [{"role": "user", "content": idea_prompt}])
+                ideas = parse_list(reply)
                 st.session_state["ideas"] = ideas
         ideas = st.session_state.get("ideas")
         if ideas:
             idea = st.selectbox("Choose idea", ideas)
             script_prompt = st.text_area("Script prompt", f"Write a short narration for: {idea}")
             if st.button("Generate Script"):
-                resp = openai.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{"role": "user", "content": script_prompt}],
-                )
-                script = resp.choices[0].message.content.strip()
+                script = api_cache.chat("gpt-4o", [{"role": "user", "content": script_prompt}])
                 st.session_state["script"] = script
         if st.session_state.get("script"):
             script = st.text_area("Script", st.session_state["script"])
             if st.button("Save Script"):
                 filename = slugify(script[:50]) + ".txt"
-                path = INPUT_DIR / filename
+                path = workspace().inputs / filename
                 path.write_text(script, encoding="utf-8")
                 st.success(f"Saved {path}")
                 st.session_state["script_path"] = str(path)
@@ -132,23 +247,31 @@ if step.startswith("1"):
 # ----------------------------- Step 2 ---------------------------------
 elif step.startswith("2"):
     st.header("Step 2: Audio Creation")
-    if not openai:
+    if not api_cache:
         st.error("openai package not available.")
     else:
         default_script = st.session_state.get("script", "")
         text = st.text_area("Narration text", default_script)
+        chunked = st.checkbox(
+            "Synthesise sentence chunks in parallel",
+            help="Faster for long scripts; only edited chunks are re-synthesised.",
+        )
+        gap = st.slider("Pause between chunks (s)", 0.0, 1.0, 0.0, 0.05, disabled=not chunked)
         if st.button("Generate Audio"):
             with st.spinner("Calling TTS..."):
                 try:
-                    response = openai.audio.speech.create(
-                        model="gpt-4o-mini-tts",
-                        voice="coral",
-                        input=text,
-                        speed=0.95,
-                    )
-                    audio_path = AUDIO_DIR / "tts_output.mp3"
+                    import tts
+
+                    audio_path = workspace().audio / "tts_output.mp3"
                     st.session_state["audio_path"] = str(audio_path)
-                    response.stream_to_file(str(audio_path))
+                    if chunked:
+                        progress = st.progress(0.0)
+                        tts.synthesize_chunked(
+                            text, audio_path, gap=gap,
+                            on_chunk=lambda i, n, _: progress.progress((i + 1) / n, f"Chunk {i + 1} of {n}"),
+                        )
+                    else:
+                        audio_path.write_bytes(api_cache.speech(tts.MODEL, tts.VOICE, text, speed=tts.SPEED))
                     st.audio(str(audio_path))
                     with open(audio_path, "rb") as f:
                         st.download_button("Download MP3", f, file_name="tts_output.mp3")
@@ -158,161 +281,181 @@ elif step.startswith("2"):
 # ----------------------------- Step 3 ---------------------------------
 elif step.startswith("3"):
     st.header("Step 3: Transcription")
-    if not openai:
+    if not api_cache:
         st.error("openai package not available.")
     else:
         audio_file = st.file_uploader("Upload audio", type=["mp3", "wav", "m4a"])
+        chunked = st.checkbox(
+            "Transcribe in parallel windows",
+            help="Splits long narrations at silences and transcribes the pieces concurrently.",
+        )
         if st.button("Transcribe") and audio_file is not None:
-            path = AUDIO_DIR / "uploaded_audio"
-            path.write_bytes(audio_file.read())
-            client = openai.OpenAI(api_key=get_key())
-            resp = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=open(path, "rb"),
-                response_format="verbose_json",
-                timestamp_granularities=["word"],
-            )
-            df = pd.DataFrame([{"word": w.word, "start": w.start, "end": w.end} for w in resp.words])
-            csv_path = TRANSCRIPT_DIR / "sentence_timestamps.csv"
-            st.session_state["transcript_csv"] = str(csv_path)
-            df.to_csv(csv_path, index=False)
-            st.dataframe(df.head())
+            ws = workspace()
+            path = save_upload(audio_file, ws.audio / "uploaded_audio")
+            st.session_state["transcribe_task"] = background_pool().submit(
+                "Transcription", transcribe, path, chunked, ws
+            ).id
+        result = task_result("transcribe_task")
+        if result:
+            words, tlx_path, csv_path = result
+            st.session_state["transcript_path"] = str(tlx_path)
+            st.dataframe(words)
             with open(csv_path, "rb") as f:
                 st.download_button("Download CSV", f, file_name="sentence_timestamps.csv")
 
 # ----------------------------- Step 4 ---------------------------------
 elif step.startswith("4"):
     st.header("Step 4: Storyboard")
-    if not openai:
+    if not api_cache:
         st.error("openai package not available.")
     else:
+        from storyboard import FORMATS, MAX_IN_FLIGHT
+
         script_text = st.text_area("Script text", st.session_state.get("script", ""))
         n_images = st.number_input("Number of scenes", min_value=1, max_value=20, value=5)
+        max_in_flight = st.number_input(
+            "Parallel image requests", min_value=1, max_value=10, value=MAX_IN_FLIGHT
+        )
+        image_format = st.selectbox(
+            "Image format", list(FORMATS), help="WebP is lossless and usually smaller than PNG"
+        )
         if st.button("Generate Images"):
-            IMAGE_DIR.mkdir(parents=True, exist_ok=True)
-            img_paths = []
-            for i in range(int(n_images)):
-                prompt = f"{script_text}\nScene {i+1}" if script_text else f"Scene {i+1}"
-                resp = openai.images.generate(
-                    model="dall-e-3",
-                    prompt=prompt,
-                    n=1,
-                    size="1024x1024",
-                )
-                img_url = resp.data[0].url
-                img_data = requests.get(img_url).content
-                img_path = IMAGE_DIR / f"scene_{i+1:03d}.png"
-                img_path.write_bytes(img_data)
-                img_paths.append(img_path)
-                st.image(str(img_path))
-            zip_path = IMAGE_DIR / "images.zip"
+            task = background_pool().submit(
+                "Storyboard", build_storyboard,
+                script_text, int(n_images), int(max_in_flight), image_format, workspace(),
+            )
+            st.session_state["storyboard_task"] = task.id
+        result = task_result("storyboard_task")
+        if result:
+            images, zip_path = result
             st.session_state["images_zip"] = str(zip_path)
-            with zipfile.ZipFile(zip_path, "w") as z:
-                for p in img_paths:
-                    z.write(p, p.name)
+            for member in images:
+                with member.open() as f:
+                    st.image(f.read(), caption=member.name)
             with open(zip_path, "rb") as f:
                 st.download_button("Download Images ZIP", f, file_name="images.zip")
 
 # ----------------------------- Step 5 ---------------------------------
 elif step.startswith("5"):
     st.header("Step 5: Metadata & Cover")
-    if not openai:
+    if not api_cache:
         st.error("openai package not available.")
     else:
         script = st.text_area("Script", st.session_state.get("script", ""))
         if st.button("Suggest Titles"):
-            resp = openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": f"Suggest 5 catchy titles for: {script}"}],
+            reply = api_cache.chat(
+                "gpt-4o-mini",
+                [{"role": "user", "content": f"Suggest 5 catchy titles for: {script}"}],
             )
-            titles = [t.strip() for t in resp.choices[0].message.content.splitlines() if t.strip()]
+            titles = parse_list(reply)
             st.session_state["titles"] = titles
         titles = st.session_state.get("titles")
         if titles:
             title = st.selectbox("Choose title", titles)
             if st.button("Generate Description & Cover"):
-                desc_resp = openai.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": f"Write a YouTube description for the video titled: {title}"}],
+                description = api_cache.chat(
+                    "gpt-4o-mini",
+                    [{"role": "user", "content": f"Write a YouTube description for the video titled: {title}"}],
                 )
-                description = desc_resp.choices[0].message.content.strip()
-                FINAL_DIR.mkdir(parents=True, exist_ok=True)
-                (FINAL_DIR / "description.txt").write_text(description)
-                with open(FINAL_DIR / "description.txt", "rb") as f:
+                final_dir = workspace().final
+                (final_dir / "description.txt").write_text(description)
+                with open(final_dir / "description.txt", "rb") as f:
                     st.download_button("Download Description", f, file_name="description.txt")
-                img_resp = openai.images.generate(
-                    model="dall-e-3",
-                    prompt=f"YouTube thumbnail for {title}",
-                    n=1,
-                    size="1024x1024",
-                )
-                img_url = img_resp.data[0].url
-                img_data = requests.get(img_url).content
-                img_path = FINAL_DIR / "cover.png"
+                img_data = api_cache.image(f"YouTube thumbnail for {title}")
+                img_path = final_dir / "cover.png"
                 img_path.write_bytes(img_data)
                 st.image(str(img_path))
                 with open(img_path, "rb") as f:
                     st.download_button("Download Cover", f, file_name="cover.png")
-                (FINAL_DIR / "title.txt").write_text(title)
+                (final_dir / "title.txt").write_text(title)
 
 # ----------------------------- Step 6 ---------------------------------
 elif step.startswith("6"):
+    from captions import WORDS_PER_LINE, CaptionStyle
+    from motion import PRESETS as MOTION_PRESETS
+    from render import PROFILES, RENDERERS, SCENE_DURATION
+    from transitions import KINDS as TRANSITION_KINDS, SECONDS as TRANSITION_SECONDS
+
     st.header("Step 6: Video Assembly")
     st.warning("This step requires moviepy and can be slow.")
     audio_file = st.file_uploader("Upload narration audio", type=["mp3", "wav"])
     images_zip = st.file_uploader("Upload storyboard ZIP", type=["zip"])
+    renderer = st.selectbox(
+        "Renderer", RENDERERS, help="ffmpeg encodes the stills directly and is much faster than moviepy."
+    )
+    profile = st.radio(
+        "Quality", list(PROFILES), index=list(PROFILES).index("final"), horizontal=True,
+        help="draft is a quick low-resolution preview for checking timing and captions.",
+    )
+    transcript_path = st.session_state.get("transcript_path")
+    align = st.checkbox(
+        "Time scenes to the Step 3 transcript",
+        value=bool(transcript_path),
+        disabled=not transcript_path,
+        help=f"Scenes last {SCENE_DURATION}s each when unchecked.",
+    )
+    burn_captions = st.checkbox("Burn in captions", disabled=not transcript_path)
+    if burn_captions:
+        words_per_line = st.slider("Caption words per line", 1, 10, WORDS_PER_LINE)
+        highlight = st.color_picker("Highlight colour", f"#{CaptionStyle.highlight_colour}")
+    motion, motion_variation, transitions, transition_seconds = [], 0.0, [], TRANSITION_SECONDS
+    if renderer != "moviepy":
+        motion = st.multiselect(
+            "Scene motion", ["random", *MOTION_PRESETS],
+            help="Pan and zoom over each still, cycling through the chosen moves scene by scene.",
+        )
+        if motion:
+            motion_variation = st.slider("Motion variation", 0.0, 0.1, 0.0, 0.01)
+        transitions = st.multiselect(
+            "Transitions", TRANSITION_KINDS, help="Used in turn between scenes, during the end of the earlier scene."
+        )
+        if transitions:
+            transition_seconds = st.slider("Transition length (s)", 0.1, 2.0, TRANSITION_SECONDS, 0.1)
+    workers = None
+    if renderer == "parallel":
+        cores = os.cpu_count() or 1
+        workers = st.number_input("Render workers", min_value=1, max_value=cores, value=cores)
     if st.button("Assemble Video"):
-        try:
-            if audio_file:
-                audio_path = AUDIO_DIR / "narration.mp3"
-                audio_path.write_bytes(audio_file.read())
-                st.session_state["audio_path"] = str(audio_path)
-            elif st.session_state.get("audio_path"):
-                st.info("Using audio from Step 2.")
-                audio_path = Path(st.session_state["audio_path"])
-            else:
-                st.error("Please upload or generate an audio file.")
-                st.stop()
-
-            if images_zip:
-                zip_path = IMAGE_DIR / "uploaded_images.zip"
-                zip_path.write_bytes(images_zip.read())
-                st.session_state["images_zip"] = str(zip_path)
-            elif st.session_state.get("images_zip"):
-                st.info("Using images from Step 4.")
-                zip_path = Path(st.session_state["images_zip"])
-            else:
-                st.error("Please upload or generate storyboard images.")
-                st.stop()
-
-            tmp_dir = IMAGE_DIR / f"temp_{uuid4().hex[:8]}"
-            tmp_dir.mkdir(parents=True, exist_ok=True)
-            with zipfile.ZipFile(zip_path) as z:
-                z.extractall(tmp_dir)
-
-            clips = []
-            for img_file in sorted(tmp_dir.glob("*.png")):
-                clip = mp.ImageClip(str(img_file)).resize(height=1080)
-                if clip.w > 1920:
-                    clip = clip.crop(x_center=clip.w / 2, width=1920)
-                else:
-                    clip = clip.resize(width=1920)
-                clips.append(clip.set_duration(3))
-
-            video = mp.concatenate_videoclips(clips, method="compose")
-            audio = mp.AudioFileClip(str(audio_path))
-            final_duration = min(video.duration, audio.duration)
-            video = video.set_audio(audio.subclip(0, final_duration)).set_duration(final_duration)
-
-            FINAL_DIR.mkdir(parents=True, exist_ok=True)
-            out_path = FINAL_DIR / "final_video.mp4"
-            video.write_videofile(str(out_path), fps=30, codec="libx264", audio_codec="aac")
-            st.session_state["video_path"] = str(out_path)
-
-            with open(out_path, "rb") as f:
-                st.download_button("Download Video", f, file_name="final_video.mp4")
-        except Exception as e:
-            st.error(f"Failed to assemble video: {e}")
-        finally:
-            if "tmp_dir" in locals() and tmp_dir.exists():
-                shutil.rmtree(tmp_dir)
+        ws = workspace()
+        if audio_file:
+            audio_path = save_upload(audio_file, ws.audio / "narration.mp3")
+            st.session_state["audio_path"] = str(audio_path)
+        elif st.session_state.get("audio_path"):
+            st.info("Using audio from Step 2.")
+            audio_path = Path(st.session_state["audio_path"])
+        else:
+            st.error("Please upload or generate an audio file.")
+            st.stop()
+
+        if images_zip:
+            zip_path = save_upload(images_zip, ws.images / "uploaded_images.zip")
+            st.session_state["images_zip"] = str(zip_path)
+        elif st.session_state.get("images_zip"):
+            st.info("Using images from Step 4.")
+            zip_path = Path(st.session_state["images_zip"])
+        else:
+            st.error("Please upload or generate storyboard images.")
+            st.stop()
+
+        style = None
+        if burn_captions and transcript_path:
+            style = CaptionStyle(words_per_line=words_per_line, highlight_colour=highlight.lstrip("#"))
+        task = background_pool().submit(
+            "Video", assemble, audio_path, zip_path, renderer,
+            int(workers) if workers else None,
+            transcript_path,
+            align,
+            style,
+            profile,
+            motion,
+            motion_variation,
+            transitions,
+            transition_seconds,
+            ws,
+        )
+        st.session_state["video_task"] = task.id
+    out_path = task_result("video_task")
+    if out_path:
+        st.session_state["video_path"] = str(out_path)
+        with open(out_path, "rb") as f:
+            st.download_button("Download Video", f, file_name=Path(out_path).name)
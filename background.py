@@ -0,0 +1,95 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+from uuid import uuid4
+
+MAX_WORKERS = int(os.getenv("TLDR_WIZARD_WORKERS", "2"))
+KEEP_FINISHED = 3600
+
+
+class Task:
+    """A function running on a :class:`BackgroundPool` and the progress it last reported."""
+
+    def __init__(self, label: str):
+        self.id = uuid4().hex
+        self.label = label
+        self.done = 0
+        self.total = 0
+        self.message = "Waiting for a free worker"
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.future: Future | None = None
+
+    def report(self, done: int, total: int, message: str = "") -> None:
+        self.done, self.total = done, total
+        self.message = message or f"{done} of {total}"
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    @property
+    def eta(self) -> float | None:
+        """Seconds left at the average rate so far, once anything is done."""
+        if not self.started or not self.done or not self.total:
+            return None
+        elapsed = time.time() - self.started
+        return elapsed / self.done * (self.total - self.done)
+
+    def status(self) -> str:
+        eta = self.eta
+        return f"{self.label}: {self.message}" + (f" (about {eta:.0f}s left)" if eta is not None else "")
+
+    @property
+    def error(self) -> BaseException | None:
+        return self.future.exception() if self.finished else None
+
+    @property
+    def result(self):
+        return self.future.result() if self.finished else None
+
+
+class BackgroundPool:
+    """A fixed number of worker threads for long-running steps, shared by every caller.
+
+    Work submitted beyond ``max_workers`` waits its turn. The submitted
+    function receives a ``progress(done, total, message="")`` keyword
+    argument to report how far it has got. Finished tasks are kept for
+    ``keep`` seconds so their results can be collected later.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS, keep: float = KEEP_FINISHED):
+        self._pool = ThreadPoolExecutor(max(1, max_workers), thread_name_prefix="background")
+        self._tasks: dict[str, Task] = {}
+        self._lock = threading.Lock()
+        self.keep = keep
+
+    def submit(self, label: str, fn: Callable, *args, **kwargs) -> Task:
+        task = Task(label)
+
+        def run():
+            task.started = time.time()
+            task.message = "Starting"
+            try:
+                return fn(*args, progress=task.report, **kwargs)
+            finally:
+                task.finished = time.time()
+
+        # The task keeps the submitter's context variables, e.g. its session's cache bypass.
+        task.future = self._pool.submit(contextvars.copy_context().run, run)
+        with self._lock:
+            self._prune()
+            self._tasks[task.id] = task
+        return task
+
+    def get(self, task_id: str | None) -> Task | None:
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.keep
+        for task_id in [t.id for t in self._tasks.values() if t.finished and t.finished < cutoff]:
+            del self._tasks[task_id]
@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from slugify import slugify
+
+from manifest import Manifest
+from pipeline import Pipeline, Workspace, make_steps
+
+RUNS_DIR = Path("data/runs")
+MAX_JOBS = 2
+API_LIMIT = 4
+CPU_LIMIT = 1
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    workspace: Workspace
+    artifacts: dict
+
+
+def plan_jobs(sources: list[str], root: Path = RUNS_DIR) -> list[Job]:
+    """One job per source, which is either a path to a script ``.txt`` or the text of a video idea.
+
+    Each job gets a workspace named after its source, so running the same
+    batch again resumes from each job's own manifest.
+    """
+    jobs, names = [], set()
+    for source in sources:
+        path = Path(source)
+        is_script = path.suffix == ".txt" and path.is_file()
+        base = slugify(path.stem if is_script else source)[:50] or "job"
+        name, k = base, 1
+        while name in names:
+            k += 1
+            name = f"{base}-{k}"
+        names.add(name)
+        artifacts = {"script": path.resolve()} if is_script else {"idea": source}
+        jobs.append(Job(name, Workspace(root / name), artifacts))
+    return jobs
+
+
+def run_batch(
+    jobs: list[Job],
+    params: dict,
+    max_jobs: int = MAX_JOBS,
+    api_limit: int = API_LIMIT,
+    cpu_limit: int = CPU_LIMIT,
+    step_workers: int = 3,
+    on_done: Callable[[Job, dict | Exception], None] | None = None,
+) -> dict[str, dict | Exception]:
+    """Run ``jobs`` concurrently, each non-interactively in its own workspace.
+
+    ``params`` are the shared pipeline parameters (``n_images``, ``render``,
+    ``tts``, ``stt``). At most ``max_jobs`` jobs are in flight; across all
+    of them at most ``api_limit`` API-bound steps and ``cpu_limit`` renders
+    run at once. A failed job is returned as its exception and does not
+    stop the others.
+    """
+    limits = {"api": threading.Semaphore(max(1, api_limit)), "cpu": threading.Semaphore(max(1, cpu_limit))}
+
+    def run_job(job: Job) -> dict:
+        workspace = job.workspace.create()
+        steps = make_steps(workspace, interactive=False)
+        artifacts = {**params, **job.artifacts}
+        # Jobs started from a script skip ideation.
+        targets = [node.name for node in steps if not set(node.outputs) <= artifacts.keys()]
+        return Pipeline(steps).run(
+            targets,
+            artifacts,
+            max_workers=step_workers,
+            manifest=Manifest(workspace.manifest),
+            limits=limits,
+        )
+
+    results = {}
+    with ThreadPoolExecutor(max(1, max_jobs)) as pool:
+        futures = {pool.submit(run_job, job): job for job in jobs}
+        for fut in as_completed(futures):
+            job = futures[fut]
+            try:
+                results[job.name] = fut.result()
+            except Exception as exc:
+                results[job.name] = exc
+            if on_done:
+                on_done(job, results[job.name])
+    return results
@@ -0,0 +1,95 @@
+"""Fire concurrent chat and image calls at a rate-limited OpenAI stand-in, with and without the shared client.
+
+    python benchmarks/bench_api_client.py --calls 60 --threads 16 --rpm 30 --latency 0.2
+
+``per-call-client`` is how the steps used to call the API: a fresh
+``openai.OpenAI()`` for every request with the SDK's two default retries.
+``shared-client`` goes through ``api_client.call``: one pooled client,
+token buckets that follow the stub's rate-limit headers, an adaptive
+concurrency limit and jittered retries. Reports wall time, calls that
+failed for good, 429s the stub sent and TCP connections it accepted.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai_stub import OpenAIStub, add_stub_options, stub_config
+
+MESSAGES = [{"role": "user", "content": "Write three lines about rate limits."}]
+
+
+def per_call(kind: str):
+    import openai
+
+    client = openai.OpenAI()
+    try:
+        if kind == "chat":
+            return client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES)
+        return client.images.generate(model="dall-e-3", prompt="A chart", n=1, size="1024x1024", response_format="b64_json")
+    finally:
+        client.close()
+
+
+def shared(kind: str):
+    import api_client
+
+    if kind == "chat":
+        return api_client.call(
+            "chat",
+            lambda client: client.chat.completions.with_raw_response.create(model="gpt-4o-mini", messages=MESSAGES),
+            tokens=api_client.estimate_tokens(MESSAGES),
+        )
+    return api_client.call(
+        "image",
+        lambda client: client.images.with_raw_response.generate(
+            model="dall-e-3", prompt="A chart", n=1, size="1024x1024", response_format="b64_json"
+        ),
+    )
+
+
+def run(stub: OpenAIStub, send, calls: int, threads: int) -> dict:
+    before = {k: stub.stats[k] for k in ("rate_limited", "connections", "errors")}
+    kinds = ["image" if i % 4 == 3 else "chat" for i in range(calls)]
+    failed = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for fut in [pool.submit(send, kind) for kind in kinds]:
+            try:
+                fut.result()
+            except Exception:
+                failed += 1
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "completed": calls - failed,
+        "failed": failed,
+        "calls_per_minute": round((calls - failed) / seconds * 60, 1),
+        **{k: stub.stats[k] - before[k] for k in before},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--threads", type=int, default=16)
+    add_stub_options(parser)
+    parser.set_defaults(rpm=30, latency=0.2, image_size=64)
+    args = parser.parse_args()
+
+    report = {"calls": args.calls, "threads": args.threads, "rpm": args.rpm}
+    for name, send in [("per-call-client", per_call), ("shared-client", shared)]:
+        # A fresh stub for each, so both start with a full budget.
+        with OpenAIStub(stub_config(args)) as stub:
+            os.environ["OPENAI_BASE_URL"] = stub.base_url
+            os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+            report[name] = run(stub, send, args.calls, args.threads)
+    import api_client
+
+    report["shared-client"]["client"] = api_client.stats()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
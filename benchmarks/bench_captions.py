@@ -0,0 +1,53 @@
+"""Measure what burning in karaoke captions adds to an ffmpeg render.
+
+    python benchmarks/bench_captions.py --scenes 10 --renderer ffmpeg
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from common import make_narration, make_storyboard, timed
+
+from captions import write_captions
+from render import SCENE_DURATION, render
+from transcript import Transcript
+
+
+def synthetic_transcript(seconds: float, words_per_second: float = 2.5) -> Transcript:
+    n = int(seconds * words_per_second)
+    step = 1 / words_per_second
+    words = [
+        {"word": f"word{i}." if i % 12 == 11 else f"word{i}", "start": i * step, "end": i * step + step * 0.8}
+        for i in range(n)
+    ]
+    return Transcript.from_words(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=10)
+    parser.add_argument("--renderer", choices=["ffmpeg", "parallel", "moviepy"], default="ffmpeg")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        seconds = args.scenes * SCENE_DURATION
+        images = make_storyboard(tmp / "images", args.scenes)
+        audio = make_narration(tmp / "narration.mp3", seconds)
+        transcript = synthetic_transcript(seconds).save(tmp / "words.tlx")
+        subtitles = write_captions(transcript, tmp / "captions.ass")
+        durations = [SCENE_DURATION] * args.scenes
+        # Warm the frame cache so both runs only measure the encode.
+        render(args.renderer, images, durations, audio, tmp / "warmup.mp4")
+        results = {}
+        with timed(results, "plain"):
+            render(args.renderer, images, durations, audio, tmp / "plain.mp4")
+        with timed(results, "captioned"):
+            render(args.renderer, images, durations, audio, tmp / "captioned.mp4", subtitles=subtitles)
+    results["overhead_pct"] = round(100 * (results["captioned"] / results["plain"] - 1), 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
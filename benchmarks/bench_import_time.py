@@ -0,0 +1,107 @@
+"""Check each entry point's import time against its startup budget.
+
+    python benchmarks/bench_import_time.py --repeat 5
+
+Every entry point is imported in a fresh interpreter under ``-X importtime``.
+Its cost is the time spent in imports beyond a bare interpreter's, best of
+``--repeat`` runs. Exits non-zero when any entry point is over budget.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from common import ROOT
+
+# Milliseconds of imports allowed per entry point, roughly 1.5x what each
+# measured when the heavy imports were made lazy. typer (via rich) and
+# streamlit are most of what remains for orchestrate and the wizard.
+BUDGETS = {
+    "orchestrate": 110,
+    "gui_orchestrator": 30,
+    "app": 140,
+    "step1": 30,
+    "step2": 35,
+    "step3": 70,
+    "step4": 70,
+    "step5": 30,
+    "step6": 70,
+}
+
+ENTRY_POINTS = {
+    "orchestrate": "import orchestrate",
+    "gui_orchestrator": "import gui_orchestrator",
+    "app": f"import runpy; runpy.run_path({str(ROOT / 'app.py')!r})",
+    **{f"step{n}": f"import pipeline; pipeline.load_script({n})" for n in range(1, 7)},
+}
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def importtime(code: str, cwd: str) -> list[tuple[int, int, bool, str]]:
+    """``(self_us, cumulative_us, top_level, module)`` for every import made while running ``code`` in ``cwd``."""
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, cwd=cwd, env=env,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"{code!r} failed:\n{proc.stderr[-2000:]}")
+    return [(int(a), int(b), not indent, name) for a, b, indent, name in _LINE.findall(proc.stderr)]
+
+
+def import_profile(code: str, cwd: str, baseline: set[str]) -> tuple[int, dict[str, int]]:
+    """Total import microseconds of ``code`` beyond the top-level imports in ``baseline``,
+    and the self time of each package imported along the way.
+    """
+    total, packages, pending = 0, {}, []
+    # -X importtime lists a module's imports before the module itself.
+    for self_us, cumulative, top_level, name in importtime(code, cwd):
+        pending.append((name.split(".")[0], self_us))
+        if top_level:
+            if name not in baseline:
+                total += cumulative
+                for package, us in pending:
+                    packages[package] = packages.get(package, 0) + us
+            pending = []
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--entry-points", nargs="+", choices=ENTRY_POINTS, default=list(ENTRY_POINTS))
+    parser.add_argument("--top", type=int, default=5, help="Slowest packages to list per entry point")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The wizard reads its API key from Streamlit secrets at startup.
+        secrets = Path(tmp) / ".streamlit" / "secrets.toml"
+        secrets.parent.mkdir()
+        secrets.write_text('OPENAI_API_KEY = "sk-benchmark"\n')
+        baseline = {name for _, _, top_level, name in importtime("pass", tmp) if top_level}
+        report, over = {}, []
+        for name in args.entry_points:
+            runs = [import_profile(ENTRY_POINTS[name], tmp, baseline) for _ in range(args.repeat)]
+            total, profile = min(runs, key=lambda r: r[0])
+            ms = round(total / 1000, 1)
+            slowest = sorted(profile.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+            report[name] = {
+                "ms": ms,
+                "budget_ms": BUDGETS[name],
+                "slowest": {k: round(v / 1000, 1) for k, v in slowest},
+            }
+            if ms > BUDGETS[name]:
+                over.append(name)
+    report["over_budget"] = over
+    print(json.dumps(report, indent=2))
+    if over:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measure what Ken Burns scene motion adds to an encode.
+
+    python benchmarks/bench_motion.py --scenes 8 --profile final --renderers ffmpeg parallel
+
+Renders the same storyboard with still scenes and with ``--motion`` presets
+and reports the encode time of each and the overhead of motion in percent.
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from common import make_narration, make_storyboard, timed
+
+from frames import frame_cache
+from motion import plan_motion
+from render import PROFILES, SCENE_DURATION, render_ffmpeg, render_parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=8)
+    parser.add_argument("--profile", choices=PROFILES, default="final")
+    parser.add_argument("--renderers", nargs="+", choices=["ffmpeg", "parallel"], default=["ffmpeg", "parallel"])
+    parser.add_argument("--motion", default="random", help="Comma-separated presets, as for step 6")
+    parser.add_argument("--variation", type=float, default=0.05)
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    motions = plan_motion(args.motion.split(","), args.scenes, args.variation, seed=0)
+    results = {"scenes": args.scenes, "profile": args.profile, "motion": args.motion, "renderers": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        images = make_storyboard(tmp / "images", args.scenes)
+        audio = make_narration(tmp / "narration.mp3", args.scenes * SCENE_DURATION)
+        durations = [SCENE_DURATION] * len(images)
+        stills = frame_cache.stills(images, profile.size)
+        encode = {"ffmpeg": render_ffmpeg, "parallel": render_parallel}
+        for renderer in args.renderers:
+            seconds = {}
+            with timed(seconds, "still"):
+                encode[renderer](stills, durations, audio, tmp / f"{renderer}-still.mp4", profile)
+            with timed(seconds, "motion"):
+                encode[renderer](stills, durations, audio, tmp / f"{renderer}-motion.mp4", profile, motion=motions)
+            seconds["overhead_pct"] = round((seconds["motion"] / seconds["still"] - 1) * 100, 1)
+            results["renderers"][renderer] = seconds
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare single-pass and parallel segment rendering speed.
+
+    python benchmarks/bench_parallel_render.py --scenes 24 --workers 8
+
+Reports each render's stream lengths alongside its time; that they agree
+within a frame is checked by tests/test_render_sync.py.
+"""
+import argparse
+import json
+import random
+import tempfile
+from pathlib import Path
+
+from common import make_narration, make_storyboard, stream_duration, timed
+
+from frames import frame_cache
+from render import HEIGHT, WIDTH, render_ffmpeg, render_parallel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=24)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--segment-scenes", type=int)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    durations = [round(rng.uniform(1.5, 4.5), 3) for _ in range(args.scenes)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        stills = frame_cache.stills(make_storyboard(tmp / "images", args.scenes), (WIDTH, HEIGHT))
+        audio = make_narration(tmp / "narration.mp3", sum(durations))
+        seconds, report = {}, {}
+        outputs = {"single": tmp / "single.mp4", "parallel": tmp / "parallel.mp4"}
+        with timed(seconds, "single"):
+            render_ffmpeg(stills, durations, audio, outputs["single"])
+        with timed(seconds, "parallel"):
+            render_parallel(stills, durations, audio, outputs["parallel"],
+                            workers=args.workers, segment_scenes=args.segment_scenes)
+        for name, out in outputs.items():
+            report[name] = {
+                "seconds": seconds[name],
+                "video": stream_duration(out, "v"),
+                "audio": stream_duration(out, "a"),
+            }
+        report["speedup"] = round(seconds["single"] / seconds["parallel"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Run the whole pipeline through orchestrate.py against the local OpenAI stand-in.
+
+    python benchmarks/bench_pipeline.py --videos 2 --n-images 5 --latency 0.3 --renderer parallel
+
+Each run makes ``--videos`` videos with ``orchestrate.py batch`` in a fresh
+directory with the API cache bypassed, so every request reaches the stub
+server. Reports per-stage wall time (from each video's manifest), render
+fps, peak RSS of the pipeline process and its children, and bytes written.
+Arguments after ``--`` are passed to ``orchestrate.py batch`` unchanged.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ROOT
+from openai_stub import OpenAIStub, add_stub_options, stub_config
+
+from render import PROFILES, RENDERERS, probe_duration
+
+
+def tree_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def run_pipeline(base_url: str, cwd: Path, ideas: list[str], args, extra: list[str]) -> tuple[float, int]:
+    """Run ``orchestrate.py batch`` and return its wall time and peak RSS in bytes."""
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": base_url,
+        "OPENAI_API_KEY": "sk-benchmark",
+        "TLDR_CACHE_BYPASS": "1",
+        "TLDR_CACHE_DIR": str(cwd / "cache"),
+        "TLDR_FRAME_CACHE_DIR": str(cwd / "frames"),
+        # The stub only limits requests with --rpm, and then says so in its headers.
+        **{f"TLDR_{kind}_RPM": "100000" for kind in ("CHAT", "SPEECH", "TRANSCRIPTION", "IMAGE")},
+    }
+    cmd = [
+        sys.executable, str(ROOT / "orchestrate.py"), *(["--trace"] if args.trace else []), "batch", *ideas,
+        "--n-images", str(args.n_images),
+        "--renderer", args.renderer,
+        "--profile", args.profile,
+        "--jobs", str(args.jobs),
+        "--api-limit", str(args.api_limit),
+        *extra,
+    ]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(f"orchestrate.py failed:\n{proc.stdout[-2000:]}{proc.stderr[-2000:]}")
+    # ru_maxrss is in KiB on Linux; the children figure is the largest single descendant.
+    return seconds, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+
+
+def video_report(cwd: Path, run_dir: Path, fps: int) -> dict:
+    manifest = json.loads((run_dir / "manifest.json").read_text())
+    stages = {name: step.get("seconds") for name, step in manifest["steps"].items()}
+    # Recorded paths are relative to the directory orchestrate ran in.
+    duration = probe_duration(cwd / manifest["steps"]["video"]["outputs"]["video"]["path"])
+    render_seconds = stages.get("video")
+    return {
+        "stages": stages,
+        "video_seconds": round(duration, 2),
+        "render_fps": round(duration * fps / render_seconds, 1) if render_seconds else None,
+        "bytes_written": tree_bytes(run_dir),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=1)
+    parser.add_argument("--n-images", type=int, default=5)
+    parser.add_argument("--renderer", choices=RENDERERS, default="ffmpeg")
+    parser.add_argument("--profile", choices=PROFILES, default="final")
+    parser.add_argument("--jobs", type=int, default=2, help="Videos in flight at once")
+    parser.add_argument("--api-limit", type=int, default=4, help="API-bound steps at once across videos")
+    parser.add_argument("--keep", type=Path, help="Run in this directory and keep its outputs")
+    parser.add_argument("--trace", action="store_true", help="Also write a trace and metrics under data/traces")
+    add_stub_options(parser)
+    args, extra = parser.parse_known_args()
+    extra = [a for a in extra if a != "--"]
+
+    ideas = [f"Benchmark video {i + 1}" for i in range(args.videos)]
+    with tempfile.TemporaryDirectory() as tmp, OpenAIStub(stub_config(args)) as stub:
+        cwd = args.keep or Path(tmp)
+        cwd.mkdir(parents=True, exist_ok=True)
+        seconds, peak_rss = run_pipeline(stub.base_url, cwd, ideas, args, extra)
+        videos = {d.name: video_report(cwd, d, PROFILES[args.profile].fps) for d in sorted((cwd / "data" / "runs").iterdir()) if d.is_dir()}
+        report = {
+            "wall_seconds": round(seconds, 2),
+            "peak_rss_mb": round(peak_rss / 2**20, 1),
+            "bytes_written": tree_bytes(cwd),
+            "api": stub.stats,
+            "videos": videos,
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare encode time and output size of each render profile on the same storyboard.
+
+    python benchmarks/bench_profiles.py --scenes 10 --renderers ffmpeg parallel
+
+Prints one row per renderer and profile. The ``x264-defaults`` row encodes
+full HD with libx264's default preset and CRF, which is what every render
+used before profiles existed.
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from common import make_narration, make_storyboard, timed
+
+from frames import frame_cache
+from render import FPS, HEIGHT, PROFILES, RENDERERS, SCENE_DURATION, WIDTH, RenderProfile, probe_duration
+from render import render_ffmpeg, render_moviepy, render_parallel
+
+BASELINE = RenderProfile(WIDTH, HEIGHT, FPS, "medium", 23)
+
+
+def encode(renderer: str, images: list[Path], durations: list[float], audio: Path, out: Path, profile: RenderProfile):
+    if renderer == "moviepy":
+        render_moviepy(frame_cache.arrays(images, profile.size), durations, audio, out, profile)
+    elif renderer == "parallel":
+        render_parallel(frame_cache.stills(images, profile.size), durations, audio, out, profile)
+    else:
+        render_ffmpeg(frame_cache.stills(images, profile.size), durations, audio, out, profile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=10)
+    parser.add_argument("--renderers", nargs="+", choices=RENDERERS, default=["ffmpeg"])
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    profiles = {"x264-defaults": BASELINE, **PROFILES}
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        images = make_storyboard(tmp / "images", args.scenes)
+        audio = make_narration(tmp / "narration.mp3", args.scenes * SCENE_DURATION)
+        durations = [SCENE_DURATION] * len(images)
+        for renderer in args.renderers:
+            for name, profile in profiles.items():
+                # Normalise the stills first so only the encode is timed.
+                frame_cache.stills(images, profile.size)
+                out = tmp / f"{renderer}-{name}.mp4"
+                seconds = {}
+                with timed(seconds, "encode"):
+                    encode(renderer, images, durations, audio, out, profile)
+                size = out.stat().st_size
+                rows.append({
+                    "renderer": renderer,
+                    "profile": name,
+                    "resolution": f"{profile.width}x{profile.height}@{profile.fps}",
+                    "x264": f"{profile.preset} crf {profile.crf}" + (f" {profile.tune}" if profile.tune else ""),
+                    "seconds": seconds["encode"],
+                    "mb": round(size / 2**20, 2),
+                    "kbps": round(size * 8 / 1000 / probe_duration(out)),
+                })
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    columns = list(rows[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Compare the moviepy and ffmpeg renderers on the same synthetic storyboard.
+
+    python benchmarks/bench_render.py --scenes 10
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from common import make_narration, make_storyboard, timed
+
+from render import RENDERERS, SCENE_DURATION, probe_duration, render
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=10)
+    parser.add_argument("--renderers", nargs="+", choices=RENDERERS, default=RENDERERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        images = make_storyboard(tmp / "images", args.scenes)
+        audio = make_narration(tmp / "narration.mp3", args.scenes * SCENE_DURATION)
+        durations = [SCENE_DURATION] * len(images)
+        seconds, report = {}, {}
+        for renderer in args.renderers:
+            out = tmp / f"{renderer}.mp4"
+            with timed(seconds, renderer):
+                render(renderer, images, durations, audio, out)
+            report[renderer] = {
+                "seconds": seconds[renderer],
+                "duration": round(probe_duration(out), 3),
+                "bytes": out.stat().st_size,
+            }
+        if "moviepy" in seconds and "ffmpeg" in seconds:
+            report["speedup"] = round(seconds["moviepy"] / seconds["ffmpeg"], 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare scene transitions composited by moviepy with the xfade filter graph.
+
+    python benchmarks/bench_transitions.py --scenes 8 --transition fade --seconds 0.5
+
+``moviepy-crossfade`` is what crossfades cost when built from composed
+clips (``crossfadein`` plus negative padding), blending every overlapping
+frame in Python. ``ffmpeg-cut`` is the hard-cut render for reference.
+Every row checks the output keeps the narration's length.
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from common import make_narration, make_storyboard, stream_duration, timed
+
+from frames import frame_cache
+from render import PROFILES, SCENE_DURATION, render_ffmpeg, render_parallel
+from transitions import KINDS, plan_transitions
+
+
+def moviepy_crossfade(frames, durations, audio_path: Path, out_path: Path, profile, seconds: float):
+    import moviepy.editor as mp
+
+    # Each later clip starts ``seconds`` early and fades in over the one before,
+    # lengthened to match so scene starts stay where the hard cuts were.
+    clips = [mp.ImageClip(frames[0]).set_duration(durations[0])]
+    for frame, duration in zip(frames[1:], durations[1:]):
+        clips.append(mp.ImageClip(frame).set_duration(duration + seconds).crossfadein(seconds))
+    # The padding is also taken off after the last clip, which still runs to the end.
+    video = mp.concatenate_videoclips(clips, method="compose", padding=-seconds).set_duration(sum(durations))
+    audio = mp.AudioFileClip(str(audio_path))
+    final_duration = min(video.duration, audio.duration)
+    video = video.set_audio(audio.subclip(0, final_duration)).set_duration(final_duration)
+    video.write_videofile(
+        str(out_path), fps=profile.fps, codec="libx264", audio_codec="aac", preset=profile.preset,
+        threads=profile.threads, ffmpeg_params=profile.x264_options(), logger=None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=8)
+    parser.add_argument("--profile", choices=PROFILES, default="final")
+    parser.add_argument("--transition", choices=KINDS[1:], default="fade")
+    parser.add_argument("--seconds", type=float, default=0.5)
+    parser.add_argument("--skip-moviepy", action="store_true", help="Leave out the slow moviepy baseline")
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    transitions = plan_transitions([args.transition], args.scenes, args.seconds)
+    report = {"scenes": args.scenes, "profile": args.profile, "transition": f"{args.transition}:{args.seconds}"}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        images = make_storyboard(tmp / "images", args.scenes)
+        audio = make_narration(tmp / "narration.mp3", args.scenes * SCENE_DURATION)
+        durations = [SCENE_DURATION] * len(images)
+        stills = frame_cache.stills(images, profile.size)
+        runs = {
+            "ffmpeg-cut": lambda out: render_ffmpeg(stills, durations, audio, out, profile),
+            "ffmpeg-xfade": lambda out: render_ffmpeg(stills, durations, audio, out, profile, transitions=transitions),
+            "parallel-xfade": lambda out: render_parallel(
+                stills, durations, audio, out, profile, transitions=transitions
+            ),
+        }
+        if not args.skip_moviepy:
+            frames = frame_cache.arrays(images, profile.size)
+            runs["moviepy-crossfade"] = lambda out: moviepy_crossfade(
+                frames, durations, audio, out, profile, args.seconds
+            )
+        seconds = {}
+        for name, run in runs.items():
+            out = tmp / f"{name}.mp4"
+            with timed(seconds, name):
+                run(out)
+            report[name] = {"seconds": seconds[name], "video_seconds": round(stream_duration(out, "v"), 3)}
+        report["xfade_overhead_pct"] = round((seconds["ffmpeg-xfade"] / seconds["ffmpeg-cut"] - 1) * 100, 1)
+        if "moviepy-crossfade" in seconds:
+            report["speedup_vs_moviepy"] = round(seconds["moviepy-crossfade"] / seconds["ffmpeg-xfade"], 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
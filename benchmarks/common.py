@@ -0,0 +1,61 @@
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from render import ffmpeg_exe, run_ffmpeg  # noqa: E402
+
+
+def make_storyboard(out_dir: Path, n_images: int, size: int = 1024) -> list[Path]:
+    """Write ``n_images`` deterministic square PNGs shaped like DALL·E output."""
+    import numpy as np
+    from PIL import Image
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(0, 255, size, dtype=np.float32)
+    paths = []
+    for i in range(n_images):
+        base = rng.integers(0, 255, 3).astype(np.float32)
+        pixels = np.empty((size, size, 3), dtype=np.float32)
+        pixels[..., 0] = (base[0] + ramp[None, :]) % 256
+        pixels[..., 1] = (base[1] + ramp[:, None]) % 256
+        pixels[..., 2] = base[2]
+        pixels += rng.normal(0, 8, pixels.shape)
+        path = out_dir / f"scene_{i + 1:03d}.png"
+        Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
+def make_narration(path: Path, seconds: float) -> Path:
+    """Write a sine-tone MP3 standing in for the TTS narration."""
+    run_ffmpeg(["-f", "lavfi", "-i", f"sine=frequency=220:duration={seconds}", "-c:a", "libmp3lame", str(path)])
+    return path
+
+
+def stream_duration(path: Path, stream: str) -> float:
+    """Decoded length in seconds of the first ``stream`` ("v" or "a") in ``path``."""
+    proc = subprocess.run(
+        [ffmpeg_exe(), "-hide_banner", "-i", str(path), "-map", f"0:{stream}:0", "-f", "null", "-"],
+        capture_output=True, text=True,
+    )
+    times = re.findall(r"time=(\d+):(\d+):(\d+\.\d+)", proc.stderr)
+    if not times:
+        raise RuntimeError(f"Could not decode {stream} stream of {path}")
+    h, m, sec = times[-1]
+    return int(h) * 3600 + int(m) * 60 + float(sec)
+
+
+@contextmanager
+def timed(results: dict, name: str):
+    start = time.perf_counter()
+    yield
+    results[name] = round(time.perf_counter() - start, 3)
+
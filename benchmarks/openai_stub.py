@@ -0,0 +1,289 @@
+"""A local stand-in for the OpenAI endpoints the pipeline calls.
+
+    python benchmarks/openai_stub.py --port 8765 --latency 0.5 --error-rate 0.05
+
+Point the scripts at it with ``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``.
+Responses are deterministic fixtures: chat replies are numbered lines,
+or in JSON mode an object with the fields of the shape the prompt shows,
+speech is a sine tone lasting as long as the text would take to read,
+transcriptions spread numbered words evenly over the uploaded audio and
+images are synthetic PNGs. Every request waits ``latency`` seconds (plus
+up to ``jitter``) and fails with a 500 with probability ``error_rate``,
+which the OpenAI client retries. With ``rpm`` set, each endpoint also
+admits that many requests a minute, answering the rest with a 429 and
+``retry-after``, and reports its budget in ``x-ratelimit-*`` headers
+the way the real API does. ``--no-json-mode`` rejects JSON-mode chats
+with a 400, like a model without it, to exercise the fallbacks.
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import random
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from common import make_narration
+
+from render import probe_duration
+
+WORDS_PER_SECOND = 2.5
+# A field in the example object a JSON-mode prompt shows, e.g. "titles": [ or "script": "
+SHAPE_FIELD = re.compile(r'"(\w+)": ([\["])')
+
+
+@dataclass
+class StubConfig:
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    chat_lines: int = 12
+    words_per_line: int = 10
+    image_size: int = 1024
+    seed: int = 0
+    rpm: int = 0
+    json_mode: bool = True
+
+
+class Fixtures:
+    """Response bodies, built once per distinct request shape and reused."""
+
+    def __init__(self, config: StubConfig, root: Path):
+        self.config = config
+        self.root = root
+        self._audio: dict[float, bytes] = {}
+        self._images: dict[int, bytes] = {}
+        self._lock = threading.Lock()
+
+    def chat(self, prompt: str) -> str:
+        c = self.config
+        words = " ".join(f"word{i}" for i in range(c.words_per_line - 1))
+        return "\n".join(f"Line {n}: {words}." for n in range(1, c.chat_lines + 1))
+
+    def chat_json(self, prompt: str) -> str:
+        lines = self.chat(prompt).splitlines()
+        fields = SHAPE_FIELD.findall(prompt)
+        return json.dumps({name: lines[:5] if kind == "[" else " ".join(lines) for name, kind in fields})
+
+    def speech(self, text: str) -> bytes:
+        seconds = max(1.0, round(len(text.split()) / WORDS_PER_SECOND * 2) / 2)
+        with self._lock:
+            if seconds not in self._audio:
+                path = make_narration(self.root / f"speech_{seconds}.mp3", seconds)
+                self._audio[seconds] = path.read_bytes()
+            return self._audio[seconds]
+
+    def transcription(self, audio: bytes) -> dict:
+        path = self.root / f"upload_{threading.get_ident()}.mp3"
+        path.write_bytes(audio)
+        duration = probe_duration(path)
+        n = max(1, int(duration * WORDS_PER_SECOND))
+        step = duration / n
+        words = [
+            {"word": f"word{i}" + ("." if i % 8 == 7 else ""), "start": round(i * step, 3), "end": round((i + 1) * step, 3)}
+            for i in range(n)
+        ]
+        text = " ".join(w["word"] for w in words)
+        return {"task": "transcribe", "language": "english", "duration": duration, "text": text, "words": words}
+
+    def image(self, prompt: str) -> bytes:
+        import numpy as np
+        from PIL import Image
+
+        # A handful of distinct images is enough to keep the encoders honest.
+        variant = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % 8
+        with self._lock:
+            if variant not in self._images:
+                size = self.config.image_size
+                rng = np.random.default_rng(self.config.seed + variant)
+                ramp = np.linspace(0, 255, size, dtype=np.float32)
+                pixels = np.empty((size, size, 3), dtype=np.float32)
+                pixels[..., 0] = ramp[None, :]
+                pixels[..., 1] = ramp[:, None]
+                pixels[..., 2] = variant * 32
+                pixels += rng.normal(0, 8, pixels.shape)
+                buf = io.BytesIO()
+                Image.fromarray(pixels.clip(0, 255).astype(np.uint8)).save(buf, "PNG")
+                self._images[variant] = buf.getvalue()
+            return self._images[variant]
+
+
+def multipart_fields(content_type: str, body: bytes) -> dict[str, bytes]:
+    message = BytesParser().parsebytes(b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body)
+    return {part.get_param("name", header="content-disposition"): part.get_payload(decode=True) for part in message.get_payload()}
+
+
+def make_handler(fixtures: Fixtures, stats: dict):
+    config = fixtures.config
+    rng = random.Random(config.seed)
+    lock = threading.Lock()
+    budgets: dict[str, tuple[float, float]] = {}
+
+    def admit(endpoint: str) -> tuple[bool, dict]:
+        """Whether ``endpoint`` has budget left for a request, and the headers describing it.
+
+        Like the real API, the budget refills continuously up to a minute's worth.
+        """
+        if not config.rpm:
+            return True, {}
+        now = time.monotonic()
+        level, stamp = budgets.get(endpoint, (config.rpm, now))
+        level = min(config.rpm, level + (now - stamp) * config.rpm / 60)
+        admitted = level >= 1
+        if admitted:
+            level -= 1
+        budgets[endpoint] = level, now
+        headers = {
+            "x-ratelimit-limit-requests": str(config.rpm),
+            "x-ratelimit-remaining-requests": str(int(level)),
+            "x-ratelimit-reset-requests": f"{(config.rpm - level) * 60 / config.rpm:.3f}s",
+        }
+        if not admitted:
+            headers["retry-after-ms"] = str(round((1 - level) * 60 / config.rpm * 1000))
+        return admitted, headers
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        limit_headers: dict = {}
+
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with lock:
+                stats["connections"] += 1
+
+        def send(self, status: int, body: bytes, content_type: str = "application/json"):
+            self.send_response(status)
+            for name, value in self.limit_headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with lock:
+                stats["bytes_sent"] += len(body)
+
+        def send_json(self, data: dict, status: int = 200):
+            self.send(status, json.dumps(data).encode("utf-8"))
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            endpoint = self.path.split("?")[0].removeprefix("/v1")
+            with lock:
+                stats["requests"][endpoint] = stats["requests"].get(endpoint, 0) + 1
+                admitted, self.limit_headers = admit(endpoint)
+                if not admitted:
+                    stats["rate_limited"] += 1
+                fail = rng.random() < config.error_rate
+                delay = config.latency + rng.uniform(0, config.jitter)
+            if not admitted:
+                error = {"message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}
+                return self.send_json({"error": error}, 429)
+            time.sleep(delay)
+            if fail:
+                with lock:
+                    stats["errors"] += 1
+                return self.send_json({"error": {"message": "stub failure", "type": "server_error"}}, 500)
+            if endpoint == "/chat/completions":
+                request = json.loads(body)
+                prompt = request["messages"][-1]["content"]
+                if request.get("response_format", {}).get("type") == "json_object":
+                    if not config.json_mode:
+                        error = {"message": "response_format is not supported", "type": "invalid_request_error"}
+                        return self.send_json({"error": error}, 400)
+                    reply = {"role": "assistant", "content": fixtures.chat_json(prompt)}
+                else:
+                    reply = {"role": "assistant", "content": fixtures.chat(prompt)}
+                prompt_tokens, completion_tokens = len(prompt.split()), len(reply["content"].split())
+                return self.send_json({
+                    "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": request["model"],
+                    "choices": [{"index": 0, "message": reply, "finish_reason": "stop"}],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                })
+            if endpoint == "/audio/speech":
+                return self.send(200, fixtures.speech(json.loads(body)["input"]), "audio/mpeg")
+            if endpoint == "/audio/transcriptions":
+                fields = multipart_fields(self.headers["Content-Type"], body)
+                return self.send_json(fixtures.transcription(fields["file"]))
+            if endpoint == "/images/generations":
+                png = fixtures.image(json.loads(body)["prompt"])
+                return self.send_json({"created": 0, "data": [{"b64_json": base64.b64encode(png).decode("ascii")}]})
+            self.send_json({"error": {"message": f"unknown endpoint {endpoint}"}}, 404)
+
+    return Handler
+
+
+class OpenAIStub:
+    """The stub server running on a background thread; use as a context manager."""
+
+    def __init__(self, config: StubConfig = StubConfig(), port: int = 0):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.stats = {"requests": {}, "errors": 0, "rate_limited": 0, "connections": 0, "bytes_sent": 0}
+        handler = make_handler(Fixtures(config, Path(self._tmp.name)), self.stats)
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "OpenAIStub":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+
+def add_stub_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every request waits")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds per request, up to")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500")
+    parser.add_argument("--chat-lines", type=int, default=12, help="Lines in every chat reply")
+    parser.add_argument("--words-per-line", type=int, default=10, help="Words in each chat reply line")
+    parser.add_argument("--image-size", type=int, default=1024, help="Side of generated images in pixels")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute each endpoint admits (0: no limit)")
+    parser.add_argument("--no-json-mode", dest="json_mode", action="store_false",
+                        help="Reject JSON-mode chat requests with a 400")
+
+
+def stub_config(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        args.latency, args.jitter, args.error_rate, args.chat_lines, args.words_per_line, args.image_size, args.seed,
+        args.rpm, args.json_mode,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_options(parser)
+    args = parser.parse_args()
+    with OpenAIStub(stub_config(args), args.port) as stub:
+        print(f"Serving on {stub.base_url}", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    print(json.dumps(stub.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from render import HEIGHT, WIDTH
+from transcript import Transcript
+
+WORDS_PER_LINE = 4
+
+
+@dataclass(frozen=True)
+class CaptionStyle:
+    """Look of the burned-in captions. Colours are ``RRGGBB`` hex strings."""
+
+    font: str = "Arial"
+    size: int = 64
+    text_colour: str = "FFFFFF"
+    highlight_colour: str = "FFD700"
+    outline_colour: str = "000000"
+    outline: int = 4
+    margin_v: int = 80
+    words_per_line: int = WORDS_PER_LINE
+
+
+def _ass_colour(rgb: str) -> str:
+    rgb = rgb.lstrip("#")
+    return f"&H00{rgb[4:6]}{rgb[2:4]}{rgb[0:2]}".upper()
+
+
+def _ass_time(t: float) -> str:
+    cs = max(0, round(t * 100))
+    return f"{cs // 360000}:{cs // 6000 % 60:02d}:{cs // 100 % 60:02d}.{cs % 100:02d}"
+
+
+def _srt_time(t: float) -> str:
+    ms = max(0, round(t * 1000))
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+
+def caption_lines(transcript: Transcript, words_per_line: int = WORDS_PER_LINE) -> list[range]:
+    """Word index ranges shown together, never spanning a sentence break."""
+    lines = []
+    for sentence in transcript.sentence_spans():
+        for i in range(sentence.start, sentence.stop, words_per_line):
+            lines.append(range(i, min(i + words_per_line, sentence.stop)))
+    return lines
+
+
+def to_srt(transcript: Transcript, words_per_line: int = WORDS_PER_LINE) -> str:
+    blocks = []
+    for n, line in enumerate(caption_lines(transcript, words_per_line), 1):
+        text = " ".join(w.strip() for w in transcript.words(line.start, line.stop))
+        start, end = float(transcript.start[line.start]), float(transcript.end[line.stop - 1])
+        blocks.append(f"{n}\n{_srt_time(start)} --> {_srt_time(end)}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def to_ass(transcript: Transcript, style: CaptionStyle = CaptionStyle()) -> str:
+    """Karaoke-style ASS captions: each word switches to the highlight colour as it is spoken and keeps it."""
+    header = (
+        "[Script Info]\nScriptType: v4.00+\n"
+        f"PlayResX: {WIDTH}\nPlayResY: {HEIGHT}\nWrapStyle: 2\nScaledBorderAndShadow: yes\n\n"
+        "[V4+ Styles]\n"
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding\n"
+        f"Style: Default,{style.font},{style.size},{_ass_colour(style.highlight_colour)},"
+        f"{_ass_colour(style.text_colour)},{_ass_colour(style.outline_colour)},&H80000000,"
+        f"-1,0,0,0,100,100,0,0,1,{style.outline},0,2,60,60,{style.margin_v},1\n\n"
+        "[Events]\nFormat: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+    )
+    events = []
+    for line in caption_lines(transcript, style.words_per_line):
+        line_start = float(transcript.start[line.start])
+        line_end = float(transcript.end[line.stop - 1])
+        # \k fills cumulatively: each word lights up when it starts and stays lit for the rest of the line.
+        marks = [*transcript.start[line.start:line.stop].tolist(), line_end]
+        parts = [
+            f"{{\\k{max(0, round((marks[k + 1] - marks[k]) * 100))}}}{word.strip()}"
+            for k, word in enumerate(transcript.words(line.start, line.stop))
+        ]
+        events.append(f"Dialogue: 0,{_ass_time(line_start)},{_ass_time(line_end)},Default,,0,0,0,,{' '.join(parts)}")
+    return header + "\n".join(events) + "\n"
+
+
+def write_captions(transcript_path: str | Path, out_path: str | Path, style: CaptionStyle = CaptionStyle()) -> Path:
+    """Write ``.ass`` (karaoke) or ``.srt`` captions for a step 3 transcript, by ``out_path`` suffix."""
+    transcript = Transcript.load(transcript_path)
+    out_path = Path(out_path)
+    if out_path.suffix == ".srt":
+        out_path.write_text(to_srt(transcript, style.words_per_line), encoding="utf-8")
+    else:
+        out_path.write_text(to_ass(transcript, style), encoding="utf-8")
+    return out_path
+
@@ -0,0 +1,160 @@
+import hashlib
+import io
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+import numpy as np
+from PIL import Image
+
+FRAME_CACHE_DIR = Path(os.getenv("TLDR_FRAME_CACHE_DIR", "data/cache/frames"))
+MAX_BYTES = int(os.getenv("TLDR_FRAME_CACHE_MAX_BYTES", str(1024**3)))
+MAX_AGE = float(os.getenv("TLDR_FRAME_CACHE_MAX_AGE_DAYS", "30")) * 86400
+IMAGE_SUFFIXES = (".png", ".webp", ".jpg", ".jpeg")
+
+
+@dataclass(frozen=True)
+class ZipMember:
+    """An image inside a storyboard ZIP, read in place instead of being extracted."""
+
+    archive: Path
+    name: str
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        with zipfile.ZipFile(self.archive) as z, z.open(self.name) as f:
+            yield f
+
+
+def zip_members(archive: str | Path, suffix: str | tuple[str, ...] = IMAGE_SUFFIXES) -> list[ZipMember]:
+    """The ``suffix`` files in ``archive`` in name order, as step 4 numbers its scenes."""
+    with zipfile.ZipFile(archive) as z:
+        names = sorted(i.filename for i in z.infolist() if not i.is_dir() and i.filename.lower().endswith(suffix))
+    return [ZipMember(Path(archive), name) for name in names]
+
+
+def open_source(source: Path | ZipMember):
+    return source.open() if isinstance(source, ZipMember) else open(source, "rb")
+
+
+def read_source(source: Path | ZipMember) -> bytes:
+    with open_source(source) as f:
+        return f.read()
+
+
+def cover_box(src_size: tuple[int, int], size: tuple[int, int]) -> tuple[float, float, float, float]:
+    """Centred crop box of ``src_size`` with the aspect ratio of ``size``."""
+    src_w, src_h = src_size
+    w, h = size
+    scale = max(w / src_w, h / src_h)
+    crop_w, crop_h = w / scale, h / scale
+    left, top = (src_w - crop_w) / 2, (src_h - crop_h) / 2
+    return left, top, left + crop_w, top + crop_h
+
+
+def fit_cover(img: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """Scale and centre-crop ``img`` to exactly ``size`` in one resampling pass."""
+    img = img.convert("RGB")
+    if img.size == size:
+        return img
+    return img.resize(size, Image.LANCZOS, box=cover_box(img.size, size))
+
+
+class FrameCache:
+    """Storyboard stills normalised to the output canvas, computed once per source.
+
+    Entries are keyed by the source image's content hash and the target
+    resolution, so the same PNG is only ever scaled and cropped once no
+    matter how many frames it covers or how often the video is rendered.
+    Frames are stored as ``.npy`` arrays (memory-mapped on load) for
+    renderers that composite in Python, and as PNGs for ffmpeg. Sources
+    are image files or :class:`ZipMember` entries, read once (a ZIP entry
+    is decompressed once) and hashed and decoded from the same bytes.
+
+    A frame never goes stale, so an entry's age is the time since it was
+    last used, kept in its atime. After each batch, entries unused for
+    ``max_age`` are dropped, then the least recently used ones until the
+    cache fits in ``max_bytes``; the batch's own frames are kept.
+    """
+
+    def __init__(self, root: Path = FRAME_CACHE_DIR, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def key(self, data: bytes, size: tuple[int, int]) -> str:
+        return f"{hashlib.sha256(data).hexdigest()[:32]}_{size[0]}x{size[1]}"
+
+    def _normalize(self, source: Path | ZipMember, size: tuple[int, int], suffix: str) -> Path:
+        data = read_source(source)
+        path = self.root / f"{self.key(data, size)}{suffix}"
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+        self.root.mkdir(parents=True, exist_ok=True)
+        with Image.open(io.BytesIO(data)) as img:
+            frame = fit_cover(img, size)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}")
+        if suffix == ".npy":
+            np.save(tmp, np.asarray(frame, dtype=np.uint8))
+        else:
+            frame.save(tmp, compress_level=1)
+        os.replace(tmp, path)
+        return path
+
+    def array_path(self, source: Path | ZipMember, size: tuple[int, int]) -> Path:
+        return self._normalize(source, size, ".npy")
+
+    def still_path(self, source: Path | ZipMember, size: tuple[int, int]) -> Path:
+        return self._normalize(source, size, ".png")
+
+    def arrays(self, sources: list[Path | ZipMember], size: tuple[int, int]) -> list[np.ndarray]:
+        with ThreadPoolExecutor() as pool:
+            paths = list(pool.map(lambda s: self.array_path(s, size), sources))
+        self.evict(keep=paths)
+        return [np.load(p, mmap_mode="r") for p in paths]
+
+    def stills(self, sources: list[Path | ZipMember], size: tuple[int, int]) -> list[Path]:
+        with ThreadPoolExecutor() as pool:
+            paths = list(pool.map(lambda s: self.still_path(s, size), sources))
+        self.evict(keep=paths)
+        return paths
+
+    def evict(self, keep: list[Path] = ()) -> None:
+        if not self.root.exists():
+            return
+        keep = set(keep)
+        now = time.time()
+        entries = []
+        for path in self.root.iterdir():
+            if ".tmp" in path.suffixes:
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if path in keep:
+                entries.append((now, st.st_size, path))
+            elif now - st.st_atime > self.max_age:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((st.st_atime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+frame_cache = FrameCache()
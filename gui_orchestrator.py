@@ -1,17 +1,22 @@
-import subprocess
+import io
+import sys
 import threading
 import tkinter as tk
+from contextlib import redirect_stderr, redirect_stdout
 from tkinter import scrolledtext, ttk
-from pathlib import Path
 
-SCRIPTS = [
-    "1. Ideation & Script Gen.py",
-    "2. Audio Creation.py",
-    "3. Timestamp Transcription.py",
-    "4. Storyboard Creation.py",
-    "5. Title, Description & Cover.py",
-    "6. Video Creation.py",
-]
+from manifest import Manifest
+from pipeline import PIPELINE, SCRIPTS, STEPS, existing_artifacts
+
+
+class _OutputWriter(io.TextIOBase):
+    def __init__(self, append):
+        self.append = append
+
+    def write(self, text):
+        self.append(text)
+        return len(text)
+
 
 class Orchestrator(tk.Tk):
     def __init__(self):
@@ -64,41 +69,40 @@ class Orchestrator(tk.Tk):
     def run_selected(self):
         idx = int(self.step_var.get()) - 1
         self.output.delete("1.0", tk.END)
-        self.run_script(SCRIPTS[idx])
+        self.run_script(idx)
 
     def run_all(self):
         self.output.delete("1.0", tk.END)
-        threading.Thread(target=self._run_all_steps, daemon=True).start()
-
-    def _run_all_steps(self):
-        for script in SCRIPTS:
-            self.append_output(f"\n=== Running: {script} ===\n")
-            self._execute_script(script)
-
-    def run_script(self, script):
-        threading.Thread(target=self._execute_script, args=(script,), daemon=True).start()
-
-    def _execute_script(self, script):
-        inputs = None
-        if script == SCRIPTS[0]:
-            edits = [line for line in self.edits.get("1.0", tk.END).splitlines() if line.strip()]
-            inputs = [self.cat_var.get(), self.idea_var.get()] + edits + [""]
-        if not Path(script).exists():
-            self.append_output(f"Script not found: {script}\n")
-            return
+        threading.Thread(target=self._execute, args=(None,), daemon=True).start()
+
+    def run_script(self, idx):
+        threading.Thread(target=self._execute, args=(idx,), daemon=True).start()
+
+    def _execute(self, idx):
+        """Run one step (or the whole pipeline when ``idx`` is None) in-process."""
+        edits = [line for line in self.edits.get("1.0", tk.END).splitlines() if line.strip()]
+        inputs = [self.cat_var.get(), self.idea_var.get()] + edits + [""]
+        writer = _OutputWriter(self.append_output)
+        stdin = sys.stdin
+        sys.stdin = io.StringIO("\n".join(inputs) + "\n")
         try:
-            proc = subprocess.Popen([
-                "python",
-                script,
-            ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-            if inputs:
-                proc.stdin.write("\n".join(inputs) + "\n")
-                proc.stdin.flush()
-            for line in proc.stdout:
-                self.append_output(line)
-            proc.wait()
-        except Exception as e:
-            self.append_output(f"Error running {script}: {e}\n")
+            with redirect_stdout(writer), redirect_stderr(writer):
+                manifest = Manifest()
+                if idx is None:
+                    PIPELINE.run(artifacts={"n_images": 5, "render": {}, "tts": {}, "stt": {}}, manifest=manifest)
+                else:
+                    node = STEPS[idx]
+                    self.append_output(f"\n=== Running: {SCRIPTS[idx]} ===\n")
+                    artifacts = existing_artifacts(5, manifest)
+                    missing = [i for i in node.inputs if i not in artifacts]
+                    if missing:
+                        self.append_output(f"{', '.join(missing)} not found. Run previous steps first.\n")
+                        return
+                    PIPELINE.run([node.name], artifacts, manifest=manifest, force=[node.name])
+        except BaseException as e:
+            self.append_output(f"Error: {e}\n")
+        finally:
+            sys.stdin = stdin
 
     def append_output(self, text):
         self.output.insert(tk.END, text)
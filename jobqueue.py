@@ -0,0 +1,312 @@
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing, nullcontext
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable
+
+import tracing
+from batch import API_LIMIT, CPU_LIMIT, Job
+from manifest import Manifest, decode_value, encode_value
+from pipeline import Node, Pipeline, Workspace, make_steps
+
+QUEUE_PATH = Path("data/queue.sqlite3")
+HEARTBEAT = 10.0
+STALE_AFTER = 60.0
+MAX_ATTEMPTS = 4
+BACKOFF = 5.0
+MAX_BACKOFF = 300.0
+POLL = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    workspace TEXT NOT NULL,
+    artifacts TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    worker TEXT,
+    heartbeat REAL,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    name TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    outputs TEXT,
+    error TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (job_id, name)
+);
+"""
+
+
+def _dumps(artifacts: dict) -> str:
+    return json.dumps({k: encode_value(v) for k, v in artifacts.items()})
+
+
+def _loads(text: str | None) -> dict:
+    return {k: decode_value(v) for k, v in json.loads(text or "{}").items()}
+
+
+def backoff(attempt: int, base: float = BACKOFF, cap: float = MAX_BACKOFF) -> float:
+    """Seconds to wait after failed attempt number ``attempt``: exponential, capped, with jitter."""
+    return min(cap, base * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+class JobQueue:
+    """Pipeline jobs and the state of each of their steps, persisted in SQLite.
+
+    A job moves ``queued`` -> ``running`` -> ``done``/``failed``. Workers
+    claim a job inside an immediate transaction, so two workers (threads
+    or processes) never take the same one, and keep its heartbeat fresh
+    while they work on it. A ``running`` job whose heartbeat is older than
+    ``stale_after`` belonged to a worker that died and can be claimed
+    again; it resumes after the last step recorded as done, reusing the
+    outputs that step wrote.
+    """
+
+    def __init__(self, path: Path = QUEUE_PATH, stale_after: float = STALE_AFTER):
+        self.path = Path(path)
+        self.stale_after = stale_after
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def _execute(self, sql: str, params=()) -> int:
+        with closing(self._connect()) as db:
+            return db.execute(sql, params).rowcount
+
+    def _query(self, sql: str, params=()) -> list[sqlite3.Row]:
+        with closing(self._connect()) as db:
+            return db.execute(sql, params).fetchall()
+
+    def enqueue(self, job: Job, params: dict) -> bool:
+        """Add ``job``; False if a job with the same name is already queued."""
+        now = time.time()
+        return self._execute(
+            "INSERT OR IGNORE INTO jobs (name, workspace, artifacts, created, updated) VALUES (?, ?, ?, ?, ?)",
+            (job.name, str(job.workspace.root), _dumps({**params, **job.artifacts}), now, now),
+        ) == 1
+
+    def claim(self, worker: str) -> sqlite3.Row | None:
+        """Take the oldest queued job, or one whose worker stopped heartbeating."""
+        now = time.time()
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT * FROM jobs WHERE state = 'queued' OR (state = 'running' AND heartbeat < ?) "
+                "ORDER BY id LIMIT 1",
+                (now - self.stale_after,),
+            ).fetchone()
+            if row:
+                db.execute(
+                    "UPDATE jobs SET state = 'running', worker = ?, heartbeat = ?, updated = ? WHERE id = ?",
+                    (worker, now, now, row["id"]),
+                )
+            db.execute("COMMIT")
+        return row
+
+    def heartbeat(self, job_id: int, worker: str) -> None:
+        self._execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ?", (time.time(), job_id, worker))
+
+    def finish(self, job_id: int, worker: str, error: str | None = None) -> None:
+        """Record how ``job_id`` ended, unless another worker has claimed it since ``worker`` did."""
+        self._execute(
+            "UPDATE jobs SET state = ?, error = ?, updated = ? WHERE id = ? AND worker = ?",
+            ("failed" if error else "done", error, time.time(), job_id, worker),
+        )
+
+    def completed(self, job_id: int) -> dict[str, dict]:
+        """Outputs of each step of ``job_id`` recorded as done."""
+        rows = self._query("SELECT name, outputs FROM steps WHERE job_id = ? AND state = 'done'", (job_id,))
+        return {row["name"]: _loads(row["outputs"]) for row in rows}
+
+    def step_attempts(self, job_id: int, step: str) -> int:
+        rows = self._query("SELECT attempts FROM steps WHERE job_id = ? AND name = ?", (job_id, step))
+        return rows[0]["attempts"] if rows else 0
+
+    def step_started(self, job_id: int, step: str) -> int:
+        """Mark ``step`` running and return its attempt number."""
+        self._execute(
+            "INSERT INTO steps (job_id, name, state, attempts, updated) VALUES (?, ?, 'running', 1, ?) "
+            "ON CONFLICT (job_id, name) DO UPDATE SET state = 'running', attempts = attempts + 1, "
+            "error = NULL, updated = excluded.updated",
+            (job_id, step, time.time()),
+        )
+        return self.step_attempts(job_id, step)
+
+    def step_done(self, job_id: int, step: str, outputs: dict) -> None:
+        self._execute(
+            "UPDATE steps SET state = 'done', outputs = ?, updated = ? WHERE job_id = ? AND name = ?",
+            (_dumps(outputs), time.time(), job_id, step),
+        )
+
+    def step_failed(self, job_id: int, step: str, error: str) -> None:
+        self._execute(
+            "UPDATE steps SET state = 'failed', error = ?, updated = ? WHERE job_id = ? AND name = ?",
+            (error, time.time(), job_id, step),
+        )
+
+    def retry(self, name: str) -> bool:
+        """Queue a failed job again with fresh attempts for its unfinished steps."""
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT id FROM jobs WHERE name = ? AND state = 'failed'", (name,)).fetchone()
+            if row:
+                db.execute("UPDATE steps SET attempts = 0 WHERE job_id = ? AND state != 'done'", (row["id"],))
+                db.execute(
+                    "UPDATE jobs SET state = 'queued', error = NULL, updated = ? WHERE id = ?",
+                    (time.time(), row["id"]),
+                )
+            db.execute("COMMIT")
+        return row is not None
+
+    def status(self) -> list[dict]:
+        """One entry per job with its state and a ``step: state (attempts)`` summary."""
+        jobs = self._query("SELECT * FROM jobs ORDER BY id")
+        steps = self._query("SELECT * FROM steps ORDER BY job_id")
+        by_job: dict[int, list] = {}
+        for s in steps:
+            by_job.setdefault(s["job_id"], []).append(f"{s['name']}: {s['state']} ({s['attempts']})")
+        return [
+            {"name": j["name"], "state": j["state"], "error": j["error"], "steps": by_job.get(j["id"], [])}
+            for j in jobs
+        ]
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def run_job(
+    queue: JobQueue,
+    row: sqlite3.Row,
+    limits: dict[str, threading.Semaphore] | None = None,
+    step_workers: int = 3,
+    max_attempts: int = MAX_ATTEMPTS,
+) -> dict:
+    """Run a claimed job from where it stopped, recording every step in ``queue``.
+
+    A failing step is retried with exponential backoff until it has been
+    attempted ``max_attempts`` times in total, counting attempts lost to
+    earlier crashes. Each attempt holds the ``limits`` slot for its step's
+    kind only while it runs, not while it waits to be retried.
+    """
+    limits = limits or {}
+    job_id = row["id"]
+    workspace = Workspace(Path(row["workspace"])).create()
+    artifacts = _loads(row["artifacts"])
+    done = queue.completed(job_id)
+    for outputs in done.values():
+        artifacts.update(outputs)
+
+    def tracked(node: Node):
+        def func(**kwargs) -> dict:
+            while True:
+                # Attempts that killed their worker never reach the except below.
+                attempt = queue.step_attempts(job_id, node.name) + 1
+                if attempt > max_attempts:
+                    error = f"{node.name} gave up after {max_attempts} attempts"
+                    queue.step_failed(job_id, node.name, error)
+                    raise RuntimeError(error)
+                queued = time.perf_counter()
+                try:
+                    with limits.get(node.kind) or nullcontext():
+                        tracing.current().add(wait_seconds=round(time.perf_counter() - queued, 3))
+                        attempt = queue.step_started(job_id, node.name)
+                        outputs = node.func(**kwargs)
+                except Exception as exc:
+                    queue.step_failed(job_id, node.name, repr(exc))
+                    if attempt >= max_attempts:
+                        raise
+                    delay = backoff(attempt)
+                    tracing.current().add(retries=1)
+                    print(f"{node.name} failed (attempt {attempt}/{max_attempts}), retrying in {delay:.0f}s: {exc}")
+                    time.sleep(delay)
+                else:
+                    queue.step_done(job_id, node.name, outputs)
+                    return outputs
+
+        return replace(node, func=func)
+
+    steps = [tracked(node) for node in make_steps(workspace, interactive=False)]
+    targets = [n.name for n in steps if n.name not in done and not set(n.outputs) <= artifacts.keys()]
+    return Pipeline(steps).run(
+        targets,
+        artifacts,
+        max_workers=step_workers,
+        manifest=Manifest(workspace.manifest),
+    )
+
+
+def work(
+    queue: JobQueue,
+    concurrency: int = 1,
+    api_limit: int = API_LIMIT,
+    cpu_limit: int = CPU_LIMIT,
+    step_workers: int = 3,
+    max_attempts: int = MAX_ATTEMPTS,
+    drain: bool = True,
+    poll: float = POLL,
+    heartbeat: float = HEARTBEAT,
+    after_job: Callable[[], None] | None = None,
+) -> None:
+    """Process jobs on ``concurrency`` worker threads sharing the API and CPU limits.
+
+    With ``drain`` the workers exit once nothing is left to claim;
+    otherwise they keep polling for new jobs every ``poll`` seconds.
+    ``after_job`` is called once each job has finished or failed.
+    """
+    limits = {"api": threading.Semaphore(max(1, api_limit)), "cpu": threading.Semaphore(max(1, cpu_limit))}
+
+    def loop():
+        me = worker_id()
+        while True:
+            row = queue.claim(me)
+            if row is None:
+                if drain:
+                    return
+                time.sleep(poll)
+                continue
+            stop = threading.Event()
+
+            def beat(job_id=row["id"]):
+                while not stop.wait(heartbeat):
+                    queue.heartbeat(job_id, me)
+
+            beater = threading.Thread(target=beat, daemon=True)
+            beater.start()
+            try:
+                result = run_job(queue, row, limits, step_workers, max_attempts)
+            except Exception as exc:
+                queue.finish(row["id"], me, repr(exc))
+                print(f"{row['name']}: failed ({exc})")
+            else:
+                queue.finish(row["id"], me)
+                print(f"{row['name']}: {result.get('video')}")
+            finally:
+                stop.set()
+                beater.join()
+            if after_job:
+                after_job()
+
+    threads = [threading.Thread(target=loop) for _ in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
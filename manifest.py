@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+MANIFEST_PATH = Path("data/manifest.json")
+
+
+def encode_value(value):
+    if isinstance(value, Path):
+        return {"path": str(value)}
+    return value
+
+
+def decode_value(value):
+    if isinstance(value, dict) and set(value) == {"path"}:
+        return Path(value["path"])
+    return value
+
+
+class Manifest:
+    """Record of what each pipeline step consumed and produced.
+
+    For every step the manifest stores a fingerprint of each input (a
+    content hash for files and directories, the JSON value for plain
+    parameters) and the outputs it wrote. A step whose current input
+    fingerprints match the recorded ones, and whose outputs still exist,
+    is up to date and can be skipped.
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.steps: dict[str, dict] = {}
+        self._hashes: dict[str, list] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            data = json.loads(self.path.read_text())
+            self.steps = data.get("steps", {})
+            self._hashes = data.get("hashes", {})
+
+    def _file_hash(self, path: Path) -> str:
+        st = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self._hashes[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def fingerprint(self, value) -> str | None:
+        if isinstance(value, Path):
+            if value.is_file():
+                return self._file_hash(value)
+            if value.is_dir():
+                h = hashlib.sha256()
+                for p in sorted(value.rglob("*")):
+                    if p.is_file():
+                        h.update(str(p.relative_to(value)).encode("utf-8"))
+                        h.update(self._file_hash(p).encode("ascii"))
+                return h.hexdigest()
+            return None
+        return json.dumps(encode_value(value), sort_keys=True)
+
+    def fingerprints(self, inputs: dict) -> dict:
+        return {name: self.fingerprint(value) for name, value in inputs.items()}
+
+    def is_fresh(self, name: str, inputs: dict) -> bool:
+        entry = self.steps.get(name)
+        if not entry or entry["inputs"] != self.fingerprints(inputs):
+            return False
+        return all(not isinstance(v, Path) or v.exists() for v in self.outputs(name).values())
+
+    def outputs(self, name: str) -> dict:
+        entry = self.steps.get(name, {})
+        return {k: decode_value(v) for k, v in entry.get("outputs", {}).items()}
+
+    def all_outputs(self) -> dict:
+        artifacts = {}
+        for name in self.steps:
+            artifacts.update(self.outputs(name))
+        return artifacts
+
+    def record(self, name: str, inputs: dict, outputs: dict, seconds: float | None = None) -> None:
+        self.steps[name] = {
+            "inputs": self.fingerprints(inputs),
+            "outputs": {k: encode_value(v) for k, v in outputs.items()},
+        }
+        if seconds is not None:
+            self.steps[name]["seconds"] = round(seconds, 3)
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            data = {"steps": self.steps, "hashes": self._hashes}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, indent=2))
+        tmp.replace(self.path)
@@ -0,0 +1,88 @@
+import random
+from dataclasses import dataclass, replace
+
+# Stills are enlarged this much before zoompan crops them, so the crop
+# window moves in half-pixel steps of the output and slow pans don't judder.
+SUPERSAMPLE = 2
+
+
+@dataclass(frozen=True)
+class Motion:
+    """Ken Burns framing of one scene, moving linearly from start to end.
+
+    ``zoom`` is the magnification (1 shows the whole still); ``x`` and
+    ``y`` are the point of the still, as fractions of its width and
+    height, kept at the centre of the frame where the zoom allows.
+    """
+
+    zoom: tuple[float, float] = (1.0, 1.0)
+    x: tuple[float, float] = (0.5, 0.5)
+    y: tuple[float, float] = (0.5, 0.5)
+
+
+PRESETS = {
+    "none": Motion(),
+    "zoom-in": Motion(zoom=(1.0, 1.15)),
+    "zoom-out": Motion(zoom=(1.15, 1.0)),
+    "pan-left": Motion(zoom=(1.12, 1.12), x=(0.58, 0.42)),
+    "pan-right": Motion(zoom=(1.12, 1.12), x=(0.42, 0.58)),
+    "pan-up": Motion(zoom=(1.12, 1.12), y=(0.58, 0.42)),
+    "pan-down": Motion(zoom=(1.12, 1.12), y=(0.42, 0.58)),
+}
+# "random" picks from these, avoiding the same move twice in a row.
+RANDOM_PRESETS = [name for name in PRESETS if name != "none"]
+
+
+def vary(motion: Motion, rng: random.Random, amount: float) -> Motion:
+    """``motion`` with its zoom and focus points nudged by up to ``amount``."""
+
+    def nudge(pair, low, high):
+        return tuple(min(high, max(low, v + rng.uniform(-amount, amount))) for v in pair)
+
+    return replace(
+        motion,
+        zoom=nudge(motion.zoom, 1.0, 1.5),
+        x=nudge(motion.x, 0.0, 1.0),
+        y=nudge(motion.y, 0.0, 1.0),
+    )
+
+
+def plan_motion(presets: list[str], n_scenes: int, variation: float = 0.0, seed: int | None = None) -> list[Motion]:
+    """One :class:`Motion` per scene, cycling through ``presets``.
+
+    ``"random"`` in ``presets`` draws a different move for that scene.
+    ``variation`` nudges every scene's zoom and framing by up to that
+    much, seeded so re-rendering the same storyboard gives the same video.
+    """
+    unknown = [p for p in presets if p != "random" and p not in PRESETS]
+    if unknown or not presets:
+        raise ValueError(f"Unknown motion preset {unknown}; choose from random, {', '.join(PRESETS)}")
+    rng = random.Random(seed)
+    motions, previous = [], None
+    for i in range(n_scenes):
+        name = presets[i % len(presets)]
+        if name == "random":
+            name = rng.choice([p for p in RANDOM_PRESETS if p != previous])
+        previous = name
+        motion = PRESETS[name]
+        motions.append(vary(motion, rng, variation) if variation else motion)
+    return motions
+
+
+def zoompan_filter(motion: Motion, n_frames: int, size: tuple[int, int], fps: int) -> str:
+    """Filter chain turning a single still into ``n_frames`` of ``motion`` at ``size``."""
+    width, height = size
+    last = max(1, n_frames - 1)
+
+    def lerp(pair) -> str:
+        start, end = pair
+        return f"({start:.4f}+{end - start:.4f}*on/{last})"
+
+    # Keep the focus point centred, but never let the crop leave the still.
+    x = f"max(0,min(iw-iw/zoom,{lerp(motion.x)}*iw-iw/zoom/2))"
+    y = f"max(0,min(ih-ih/zoom,{lerp(motion.y)}*ih-ih/zoom/2))"
+    return (
+        f"scale={width * SUPERSAMPLE}:{height * SUPERSAMPLE},"
+        f"zoompan=z='{lerp(motion.zoom)}':x='{x}':y='{y}':d={n_frames}:s={width}x{height}:fps={fps},"
+        "setsar=1"
+    )
@@ -1,104 +1,296 @@
-import subprocess
+import os
+import random
 from pathlib import Path
+import click
 import typer
 from dotenv import load_dotenv
 
-app = typer.Typer(help="Run the TLDR Studios pipeline")
+import tracing
+from batch import API_LIMIT, CPU_LIMIT, MAX_JOBS, plan_jobs, run_batch
+from jobqueue import MAX_ATTEMPTS, JobQueue, work
+from manifest import Manifest
+from motion import plan_motion
+from pipeline import PIPELINE, STEPS, Pipeline, Workspace, existing_artifacts, make_steps
+from render import PROFILES
+from transitions import plan_transitions
 
-SCRIPTS = [
-    "1. Ideation & Script Gen.py",
-    "2. Audio Creation.py",
-    "3. Timestamp Transcription.py",
-    "4. Storyboard Creation.py",
-    "5. Title, Description & Cover.py",
-    "6. Video Creation.py",
-]
+app = typer.Typer(help="Run the TLDR Studios pipeline")
+# Checked when the command line is parsed, as step 6 does with choices=PROFILES.
+PROFILE = click.Choice(list(PROFILES))
 
-DATA_DIR = Path("data")
-INPUT_DIR = DATA_DIR / "inputs"
-AUDIO_DIR = DATA_DIR / "audio"
-IMAGE_DIR = DATA_DIR / "images"
-FINAL_DIR = DATA_DIR / "final"
+Workspace().create()
 
-for d in [INPUT_DIR, AUDIO_DIR, IMAGE_DIR, FINAL_DIR]:
-    d.mkdir(parents=True, exist_ok=True)
 
+@app.callback()
+def main(
+    ctx: typer.Context,
+    trace: bool = typer.Option(False, "--trace", help="Write a Chrome trace and Prometheus metrics to data/traces"),
+):
+    if trace:
+        tracing.tracer.enabled = True
+    if tracing.tracer.enabled:
+        ctx.call_on_close(export_trace)
 
-def latest_file(path: Path, pattern: str) -> Path | None:
-    files = sorted(path.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
-    return files[0] if files else None
 
+def export_trace():
+    trace_path, metrics_path = tracing.tracer.export()
+    if trace_path:
+        typer.echo(f"Trace written to {trace_path} (metrics in {metrics_path})")
 
-def run_step1():
-    subprocess.run(["python", SCRIPTS[0]], check=True)
 
+def print_plan(steps):
+    for node, reason in steps:
+        typer.echo(f"{node.name:<14} {reason}")
 
-def run_step2():
-    script = latest_file(INPUT_DIR, "*.txt")
-    if not script:
-        raise typer.Exit("No script found in data/inputs")
-    subprocess.run(["python", SCRIPTS[1], str(script)], check=True)
 
+def set_cache_bypass(no_cache: bool):
+    if no_cache:
+        os.environ["TLDR_CACHE_BYPASS"] = "1"
 
-def run_step3():
-    audio = AUDIO_DIR / "tts_output.mp3"
-    if not audio.exists():
-        raise typer.Exit("Audio file not found. Run step 2 first.")
-    subprocess.run(["python", SCRIPTS[2], str(audio)], check=True)
 
+def step_params(
+    n_images, renderer, render_workers, segment_scenes, captions, words_per_line,
+    tts_chunked, tts_workers, gap, stt_chunked, stt_workers, profile, motion, motion_variation,
+    transitions, transition_seconds,
+) -> dict:
+    """Parameter artifacts shared by the commands, from their command-line options.
 
-def run_step4(n: int = 5):
-    script = latest_file(INPUT_DIR, "*.txt")
-    if not script:
-        raise typer.Exit("No script found in data/inputs")
-    subprocess.run(["python", SCRIPTS[3], str(script), str(n)], check=True)
+    Render options are checked here rather than at the video step, after
+    the paid steps have run.
+    """
+    if renderer == "moviepy" and (motion or transitions):
+        raise typer.Exit("--motion and --transitions need --renderer ffmpeg or parallel")
+    try:
+        if motion:
+            plan_motion(motion.split(","), 1)
+        if transitions:
+            plan_transitions(transitions.split(","), 2, transition_seconds)
+    except ValueError as e:
+        raise typer.Exit(str(e)) from None
+    render = {
+        "renderer": renderer,
+        "workers": render_workers,
+        "segment_scenes": segment_scenes,
+        "captions": captions,
+        "words_per_line": words_per_line,
+        "profile": profile,
+        "motion": motion,
+        "motion_variation": motion_variation,
+        "transitions": transitions,
+        "transition_seconds": transition_seconds,
+    }
+    tts = {"chunked": tts_chunked, "max_in_flight": tts_workers, "gap": gap}
+    stt = {"chunked": stt_chunked, "max_in_flight": stt_workers}
+    return {"n_images": n_images, "render": render, "tts": tts, "stt": stt}
 
 
-def run_step5():
-    script = latest_file(INPUT_DIR, "*.txt")
-    if not script:
-        raise typer.Exit("No script found in data/inputs")
-    subprocess.run(["python", SCRIPTS[4], str(script)], check=True)
+@app.command()
+def all(
+    n_images: int = typer.Option(5, help="Number of images for storyboard"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the API response cache"),
+    workers: int = typer.Option(3, help="Steps allowed to run at the same time"),
+    force: list[str] = typer.Option([], help="Step name to rebuild even if up to date (repeatable)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Print which steps would run and exit"),
+    renderer: str = typer.Option("moviepy", help="Video renderer: moviepy, ffmpeg or parallel"),
+    render_workers: int = typer.Option(None, help="Segment encoders for the parallel renderer"),
+    segment_scenes: int = typer.Option(None, help="Scenes per segment for the parallel renderer"),
+    tts_chunked: bool = typer.Option(False, "--tts-chunked", help="Synthesise narration in concurrent sentence chunks"),
+    tts_workers: int = typer.Option(4, help="Chunks synthesised at once with --tts-chunked"),
+    gap: float = typer.Option(0.0, help="Seconds of silence between chunks with --tts-chunked"),
+    stt_chunked: bool = typer.Option(False, "--stt-chunked", help="Transcribe overlapping audio windows concurrently"),
+    stt_workers: int = typer.Option(4, help="Windows transcribed at once with --stt-chunked"),
+    captions: str = typer.Option(None, help="Burn in captions: ass (karaoke highlight) or srt"),
+    words_per_line: int = typer.Option(4, help="Caption words shown at once"),
+    profile: str = typer.Option("final", click_type=PROFILE, help="Render profile; draft is a fast low-res preview"),
+    motion: str = typer.Option(None, help="Comma-separated pan/zoom moves per scene, e.g. random or zoom-in,pan-left"),
+    motion_variation: float = typer.Option(0.0, help="Random nudge to each scene's zoom and framing, e.g. 0.05"),
+    transitions: str = typer.Option(None, help="Transitions between scenes, cycled, e.g. fade or dissolve:1,wipeleft"),
+    transition_seconds: float = typer.Option(0.5, help="Length of transitions given without their own"),
+    auto: bool = typer.Option(False, "--auto", help="Let the model pick the idea and use the first title, no prompts"),
+    seed: int = typer.Option(None, help="With --auto, repeat the plan drawn with this seed instead of a new one"),
+):
+    """Run the pipeline, skipping steps whose inputs are unchanged since the last run"""
+    load_dotenv()
+    set_cache_bypass(no_cache)
+    manifest = Manifest()
+    artifacts = step_params(
+        n_images, renderer, render_workers, segment_scenes, captions, words_per_line,
+        tts_chunked, tts_workers, gap, stt_chunked, stt_workers, profile, motion, motion_variation,
+        transitions, transition_seconds,
+    )
+    if auto:
+        # A new seed per run, so the manifest sees a new input and the model draws a new plan.
+        artifacts["seed"] = random.randrange(2**31) if seed is None else seed
+    pipeline = Pipeline(make_steps(auto=True)) if auto else PIPELINE
+    if dry_run:
+        print_plan(pipeline.explain(artifacts=artifacts, manifest=manifest, force=force))
+        return
+    pipeline.run(artifacts=artifacts, max_workers=workers, manifest=manifest, force=force)
 
 
-def run_step6():
-    audio = AUDIO_DIR / "tts_output.mp3"
-    images_zip = IMAGE_DIR / "images.zip"
-    if not audio.exists() or not images_zip.exists():
-        raise typer.Exit("Audio or images not found. Run previous steps first.")
-    subprocess.run(["python", SCRIPTS[5], str(audio), str(images_zip)], check=True)
+@app.command()
+def step(
+    n: int = typer.Argument(..., help="Script number to run (1-6)"),
+    n_images: int = typer.Option(5, help="Number of images for storyboard"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the API response cache"),
+    renderer: str = typer.Option("moviepy", help="Video renderer: moviepy, ffmpeg or parallel"),
+    render_workers: int = typer.Option(None, help="Segment encoders for the parallel renderer"),
+    segment_scenes: int = typer.Option(None, help="Scenes per segment for the parallel renderer"),
+    tts_chunked: bool = typer.Option(False, "--tts-chunked", help="Synthesise narration in concurrent sentence chunks"),
+    tts_workers: int = typer.Option(4, help="Chunks synthesised at once with --tts-chunked"),
+    gap: float = typer.Option(0.0, help="Seconds of silence between chunks with --tts-chunked"),
+    stt_chunked: bool = typer.Option(False, "--stt-chunked", help="Transcribe overlapping audio windows concurrently"),
+    stt_workers: int = typer.Option(4, help="Windows transcribed at once with --stt-chunked"),
+    captions: str = typer.Option(None, help="Burn in captions: ass (karaoke highlight) or srt"),
+    words_per_line: int = typer.Option(4, help="Caption words shown at once"),
+    profile: str = typer.Option("final", click_type=PROFILE, help="Render profile; draft is a fast low-res preview"),
+    motion: str = typer.Option(None, help="Comma-separated pan/zoom moves per scene, e.g. random or zoom-in,pan-left"),
+    motion_variation: float = typer.Option(0.0, help="Random nudge to each scene's zoom and framing, e.g. 0.05"),
+    transitions: str = typer.Option(None, help="Transitions between scenes, cycled, e.g. fade or dissolve:1,wipeleft"),
+    transition_seconds: float = typer.Option(0.5, help="Length of transitions given without their own"),
+):
+    """Run a single numbered script"""
+    load_dotenv()
+    set_cache_bypass(no_cache)
+    if not 1 <= n <= len(STEPS):
+        raise typer.Exit("Invalid step number")
+    node = STEPS[n - 1]
+    manifest = Manifest()
+    params = step_params(
+        n_images, renderer, render_workers, segment_scenes, captions, words_per_line,
+        tts_chunked, tts_workers, gap, stt_chunked, stt_workers, profile, motion, motion_variation,
+        transitions, transition_seconds,
+    )
+    artifacts = existing_artifacts(n_images, manifest, params["render"], params["tts"], params["stt"])
+    missing = [i for i in node.inputs if i not in artifacts]
+    if missing:
+        raise typer.Exit(f"{', '.join(missing)} not found. Run previous steps first.")
+    PIPELINE.run([node.name], artifacts, manifest=manifest, force=[node.name])
 
 
 @app.command()
-def all(n_images: int = typer.Option(5, help="Number of images for storyboard")):
-    """Run all scripts sequentially"""
+def batch(
+    sources: list[str] = typer.Argument(None, help="Video ideas, or paths to script .txt files"),
+    ideas_file: Path = typer.Option(None, help="File with one idea or script path per line"),
+    jobs: int = typer.Option(MAX_JOBS, help="Videos in flight at the same time"),
+    api_limit: int = typer.Option(API_LIMIT, help="API-bound steps running at once across all videos"),
+    cpu_limit: int = typer.Option(CPU_LIMIT, help="Renders running at once across all videos"),
+    n_images: int = typer.Option(5, help="Number of images for storyboard"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the API response cache"),
+    workers: int = typer.Option(3, help="Steps of one video allowed to run at the same time"),
+    renderer: str = typer.Option("ffmpeg", help="Video renderer: moviepy, ffmpeg or parallel"),
+    render_workers: int = typer.Option(None, help="Segment encoders for the parallel renderer"),
+    segment_scenes: int = typer.Option(None, help="Scenes per segment for the parallel renderer"),
+    tts_chunked: bool = typer.Option(False, "--tts-chunked", help="Synthesise narration in concurrent sentence chunks"),
+    tts_workers: int = typer.Option(4, help="Chunks synthesised at once with --tts-chunked"),
+    gap: float = typer.Option(0.0, help="Seconds of silence between chunks with --tts-chunked"),
+    stt_chunked: bool = typer.Option(False, "--stt-chunked", help="Transcribe overlapping audio windows concurrently"),
+    stt_workers: int = typer.Option(4, help="Windows transcribed at once with --stt-chunked"),
+    captions: str = typer.Option(None, help="Burn in captions: ass (karaoke highlight) or srt"),
+    words_per_line: int = typer.Option(4, help="Caption words shown at once"),
+    profile: str = typer.Option("final", click_type=PROFILE, help="Render profile; draft is a fast low-res preview"),
+    motion: str = typer.Option(None, help="Comma-separated pan/zoom moves per scene, e.g. random or zoom-in,pan-left"),
+    motion_variation: float = typer.Option(0.0, help="Random nudge to each scene's zoom and framing, e.g. 0.05"),
+    transitions: str = typer.Option(None, help="Transitions between scenes, cycled, e.g. fade or dissolve:1,wipeleft"),
+    transition_seconds: float = typer.Option(0.5, help="Length of transitions given without their own"),
+):
+    """Make several videos at once, each in its own folder under data/runs"""
     load_dotenv()
-    run_step1()
-    run_step2()
-    run_step3()
-    run_step4(n_images)
-    run_step5()
-    run_step6()
+    set_cache_bypass(no_cache)
+    sources = list(sources or [])
+    if ideas_file:
+        sources += [line.strip() for line in ideas_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+    if not sources:
+        raise typer.Exit("Nothing to do: pass ideas, script paths or --ideas-file")
+    params = step_params(
+        n_images, renderer, render_workers, segment_scenes, captions, words_per_line,
+        tts_chunked, tts_workers, gap, stt_chunked, stt_workers, profile, motion, motion_variation,
+        transitions, transition_seconds,
+    )
+
+    def report(job, result):
+        if isinstance(result, Exception):
+            typer.echo(f"{job.name}: failed ({result})")
+        else:
+            typer.echo(f"{job.name}: {result['video']}")
+
+    results = run_batch(plan_jobs(sources), params, jobs, api_limit, cpu_limit, workers, on_done=report)
+    failed = [name for name, result in results.items() if isinstance(result, Exception)]
+    typer.echo(f"{len(results) - len(failed)}/{len(results)} videos done")
+    if failed:
+        raise typer.Exit(1)
 
 
 @app.command()
-def step(n: int = typer.Argument(..., help="Script number to run (1-6)"), n_images: int = typer.Option(5, help="Number of images for storyboard")):
-    """Run a single numbered script"""
+def enqueue(
+    sources: list[str] = typer.Argument(None, help="Video ideas, or paths to script .txt files"),
+    ideas_file: Path = typer.Option(None, help="File with one idea or script path per line"),
+    n_images: int = typer.Option(5, help="Number of images for storyboard"),
+    renderer: str = typer.Option("ffmpeg", help="Video renderer: moviepy, ffmpeg or parallel"),
+    render_workers: int = typer.Option(None, help="Segment encoders for the parallel renderer"),
+    segment_scenes: int = typer.Option(None, help="Scenes per segment for the parallel renderer"),
+    tts_chunked: bool = typer.Option(False, "--tts-chunked", help="Synthesise narration in concurrent sentence chunks"),
+    tts_workers: int = typer.Option(4, help="Chunks synthesised at once with --tts-chunked"),
+    gap: float = typer.Option(0.0, help="Seconds of silence between chunks with --tts-chunked"),
+    stt_chunked: bool = typer.Option(False, "--stt-chunked", help="Transcribe overlapping audio windows concurrently"),
+    stt_workers: int = typer.Option(4, help="Windows transcribed at once with --stt-chunked"),
+    captions: str = typer.Option(None, help="Burn in captions: ass (karaoke highlight) or srt"),
+    words_per_line: int = typer.Option(4, help="Caption words shown at once"),
+    profile: str = typer.Option("final", click_type=PROFILE, help="Render profile; draft is a fast low-res preview"),
+    motion: str = typer.Option(None, help="Comma-separated pan/zoom moves per scene, e.g. random or zoom-in,pan-left"),
+    motion_variation: float = typer.Option(0.0, help="Random nudge to each scene's zoom and framing, e.g. 0.05"),
+    transitions: str = typer.Option(None, help="Transitions between scenes, cycled, e.g. fade or dissolve:1,wipeleft"),
+    transition_seconds: float = typer.Option(0.5, help="Length of transitions given without their own"),
+):
+    """Add videos to the persistent job queue for `work` to make"""
+    sources = list(sources or [])
+    if ideas_file:
+        sources += [line.strip() for line in ideas_file.read_text(encoding="utf-8").splitlines() if line.strip()]
+    params = step_params(
+        n_images, renderer, render_workers, segment_scenes, captions, words_per_line,
+        tts_chunked, tts_workers, gap, stt_chunked, stt_workers, profile, motion, motion_variation,
+        transitions, transition_seconds,
+    )
+    queue = JobQueue()
+    for job in plan_jobs(sources):
+        typer.echo(f"{job.name}: {'queued' if queue.enqueue(job, params) else 'already in the queue'}")
+
+
+@app.command(name="work")
+def work_queue(
+    concurrency: int = typer.Option(1, help="Jobs worked on at the same time by this process"),
+    api_limit: int = typer.Option(API_LIMIT, help="API-bound steps running at once across this process"),
+    cpu_limit: int = typer.Option(CPU_LIMIT, help="Renders running at once across this process"),
+    workers: int = typer.Option(3, help="Steps of one video allowed to run at the same time"),
+    max_attempts: int = typer.Option(MAX_ATTEMPTS, help="Tries per step before its job fails"),
+    forever: bool = typer.Option(False, "--forever", help="Keep polling for new jobs instead of exiting when idle"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the API response cache"),
+):
+    """Make queued videos, resuming jobs left unfinished by a crashed worker"""
     load_dotenv()
-    if n == 1:
-        run_step1()
-    elif n == 2:
-        run_step2()
-    elif n == 3:
-        run_step3()
-    elif n == 4:
-        run_step4(n_images)
-    elif n == 5:
-        run_step5()
-    elif n == 6:
-        run_step6()
-    else:
-        raise typer.Exit("Invalid step number")
+    set_cache_bypass(no_cache)
+    # Export after every job, so the metrics follow a long-running worker instead of waiting for it to exit.
+    after_job = export_trace if tracing.tracer.enabled else None
+    work(JobQueue(), concurrency, api_limit, cpu_limit, workers, max_attempts, drain=not forever, after_job=after_job)
+
+
+@app.command()
+def jobs():
+    """Show queued jobs and the state of their steps"""
+    for job in JobQueue().status():
+        typer.echo(f"{job['name']:<40} {job['state']}")
+        for line in job["steps"]:
+            typer.echo(f"    {line}")
+        if job["error"]:
+            typer.echo(f"    error: {job['error']}")
+
+
+@app.command()
+def retry(name: str = typer.Argument(..., help="Name of a failed job")):
+    """Queue a failed job again; steps that already succeeded are not repeated"""
+    if not JobQueue().retry(name):
+        raise typer.Exit(f"No failed job named {name}")
+    typer.echo(f"{name}: queued")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,313 @@
+import importlib.util
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from types import ModuleType
+from typing import Callable
+
+import tracing
+from manifest import Manifest
+
+ROOT = Path(__file__).resolve().parent
+
+SCRIPTS = [
+    "1. Ideation & Script Gen.py",
+    "2. Audio Creation.py",
+    "3. Timestamp Transcription.py",
+    "4. Storyboard Creation.py",
+    "5. Title, Description & Cover.py",
+    "6. Video Creation.py",
+]
+
+_modules: dict[int, ModuleType] = {}
+_modules_lock = threading.Lock()
+
+
+def load_script(n: int) -> ModuleType:
+    """Import numbered script ``n`` once per process so its ``main`` can be called in-process."""
+    with _modules_lock:
+        if n not in _modules:
+            spec = importlib.util.spec_from_file_location(f"step{n}", ROOT / SCRIPTS[n - 1])
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _modules[n] = module
+        return _modules[n]
+
+
+@dataclass(frozen=True)
+class Node:
+    """One pipeline step.
+
+    ``func`` receives the artifacts named in ``inputs`` as keyword arguments
+    and returns a dict with an entry for every name in ``outputs``.
+    ``kind`` says which resource the step mostly waits on (``api`` or
+    ``cpu``), so callers can cap each separately.
+    """
+
+    name: str
+    func: Callable[..., dict]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    kind: str = "api"
+
+
+@dataclass(frozen=True)
+class Workspace:
+    """Folders one run reads and writes. Separate workspaces never share output paths."""
+
+    root: Path = Path("data")
+
+    @property
+    def inputs(self) -> Path:
+        return self.root / "inputs"
+
+    @property
+    def audio(self) -> Path:
+        return self.root / "audio"
+
+    @property
+    def transcripts(self) -> Path:
+        return self.root / "transcripts"
+
+    @property
+    def images(self) -> Path:
+        return self.root / "images"
+
+    @property
+    def final(self) -> Path:
+        return self.root / "final"
+
+    @property
+    def manifest(self) -> Path:
+        return self.root / "manifest.json"
+
+    def create(self) -> "Workspace":
+        for d in [self.inputs, self.audio, self.transcripts, self.images, self.final]:
+            d.mkdir(parents=True, exist_ok=True)
+        return self
+
+
+class Pipeline:
+    def __init__(self, nodes: list[Node]):
+        self.nodes = {node.name: node for node in nodes}
+        self.producers = {out: node for node in nodes for out in node.outputs}
+
+    def plan(self, targets: list[str], artifacts: dict) -> list[Node]:
+        """Return the nodes needed to run ``targets``, in dependency order.
+
+        Inputs already present in ``artifacts`` are not rebuilt.
+        """
+        order: list[Node] = []
+        seen: set[str] = set()
+
+        def visit(name: str):
+            if name in seen:
+                return
+            seen.add(name)
+            node = self.nodes[name]
+            for inp in node.inputs:
+                if inp in artifacts:
+                    continue
+                if inp not in self.producers:
+                    raise ValueError(f"No step produces {inp!r} required by {name!r}")
+                visit(self.producers[inp].name)
+            order.append(node)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def explain(
+        self, targets: list[str] | None = None, artifacts: dict | None = None, manifest: Manifest | None = None, force=()
+    ) -> list[tuple[Node, str]]:
+        """Return ``(node, reason)`` pairs describing what :meth:`run` would do."""
+        artifacts = dict(artifacts or {})
+        stale: set[str] = set()
+        steps = []
+        for node in self.plan(targets or list(self.nodes), artifacts):
+            changed = [i for i in node.inputs if i in stale]
+            inputs = {i: artifacts.get(i) for i in node.inputs}
+            if node.name in force:
+                reason = "run (forced)"
+            elif changed:
+                reason = f"run ({', '.join(changed)} will change)"
+            elif manifest is None or not manifest.is_fresh(node.name, inputs):
+                reason = "run (inputs changed)" if manifest and node.name in manifest.steps else "run"
+            else:
+                reason = "skip (up to date)"
+                artifacts.update(manifest.outputs(node.name))
+            if reason.startswith("run"):
+                stale.update(node.outputs)
+            steps.append((node, reason))
+        return steps
+
+    def run(
+        self,
+        targets: list[str] | None = None,
+        artifacts: dict | None = None,
+        max_workers: int = 3,
+        manifest: Manifest | None = None,
+        force=(),
+        limits: dict[str, threading.Semaphore] | None = None,
+    ) -> dict:
+        """Run ``targets`` (all nodes by default), starting independent nodes concurrently.
+
+        With a ``manifest``, nodes whose inputs are unchanged since their
+        last recorded run are skipped and their recorded outputs reused.
+        ``limits`` maps a node ``kind`` to a semaphore held while a node of
+        that kind runs; sharing them between pipelines caps the whole batch.
+        """
+        limits = limits or {}
+
+        def call(node: Node, kwargs: dict) -> tuple[dict, float]:
+            queued = time.perf_counter()
+            with limits.get(node.kind) or nullcontext():
+                start = time.perf_counter()
+                with tracing.span(node.name, "step", kind=node.kind, wait_seconds=round(start - queued, 3)) as span:
+                    outputs = node.func(**kwargs)
+                    span.set(bytes=sum(tracing.file_bytes(v) for v in outputs.values()))
+                return outputs, time.perf_counter() - start
+
+        artifacts = dict(artifacts or {})
+        pending = self.plan(targets or list(self.nodes), artifacts)
+        running = {}
+        with ThreadPoolExecutor(max_workers) as pool:
+            while pending or running:
+                ready = [n for n in pending if all(i in artifacts for i in n.inputs)]
+                while ready:
+                    for node in ready:
+                        pending.remove(node)
+                        kwargs = {i: artifacts[i] for i in node.inputs}
+                        if manifest and node.name not in force and manifest.is_fresh(node.name, kwargs):
+                            print(f"Skipping {node.name} (up to date)")
+                            artifacts.update(manifest.outputs(node.name))
+                        else:
+                            running[pool.submit(call, node, kwargs)] = (node, kwargs)
+                    ready = [n for n in pending if all(i in artifacts for i in n.inputs)]
+                if not running:
+                    if not pending:
+                        break
+                    missing = sorted({i for n in pending for i in n.inputs if i not in artifacts})
+                    raise RuntimeError(f"Pipeline stalled waiting for {', '.join(missing)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    node, kwargs = running.pop(fut)
+                    try:
+                        outputs, seconds = fut.result()
+                    except BaseException:
+                        for other in running:
+                            other.cancel()
+                        raise
+                    artifacts.update(outputs)
+                    if manifest:
+                        manifest.record(node.name, kwargs, outputs, seconds)
+        return artifacts
+
+
+def latest_file(path: Path, pattern: str) -> Path | None:
+    files = sorted(path.glob(pattern), key=lambda p: p.stat().st_mtime, reverse=True)
+    return files[0] if files else None
+
+
+def existing_artifacts(
+    n_images: int,
+    manifest: Manifest | None = None,
+    render: dict | None = None,
+    tts: dict | None = None,
+    stt: dict | None = None,
+    workspace: Workspace = Workspace(),
+) -> dict:
+    """Artifacts left on disk by earlier runs, used as inputs for single steps.
+
+    Outputs recorded in the manifest win; files are only guessed from the
+    workspace folders when no run has been recorded yet.
+    """
+    artifacts = {"n_images": n_images, "render": render or {}, "tts": tts or {}, "stt": stt or {}}
+    script = latest_file(workspace.inputs, "*.txt")
+    if script:
+        artifacts["script"] = script
+    for name, path in [
+        ("audio", workspace.audio / "tts_output.mp3"),
+        ("transcript", workspace.transcripts / "sentence_timestamps.tlx"),
+        ("images", workspace.images / "images.zip"),
+    ]:
+        if path.exists():
+            artifacts[name] = path
+    if manifest:
+        recorded = {k: v for k, v in manifest.all_outputs().items() if not isinstance(v, Path) or v.exists()}
+        artifacts.update(recorded)
+    return artifacts
+
+
+def ideation(out_dir: Path, auto: bool = False, seed: int | None = None) -> dict:
+    return {"script": load_script(1).main(out_dir, auto, seed)}
+
+
+def ideation_from(idea: str, out_dir: Path) -> dict:
+    return {"script": load_script(1).write_script(idea, out_dir)}
+
+
+def audio(script: Path, tts: dict, out_dir: Path) -> dict:
+    return {"audio": load_script(2).main(str(script), **tts, out_dir=out_dir)}
+
+
+def transcription(audio: Path, stt: dict, out_dir: Path) -> dict:
+    return {"transcript": load_script(3).main(str(audio), **stt, out_dir=out_dir)}
+
+
+def storyboard(script: Path, n_images: int, out_dir: Path) -> dict:
+    return {"images": load_script(4).main(str(script), n_images, out_dir=out_dir)}
+
+
+def metadata(script: Path, out_dir: Path, choice: int | None = None) -> dict:
+    return {"metadata": load_script(5).main(str(script), out_dir, choice)}
+
+
+def video(audio: Path, images: Path, transcript: Path, render: dict, out_dir: Path) -> dict:
+    return {"video": load_script(6).main(str(audio), str(images), str(transcript), **render, out_dir=out_dir)}
+
+
+def make_steps(workspace: Workspace = Workspace(), interactive: bool = True, auto: bool = False) -> list[Node]:
+    """The pipeline's steps, writing into ``workspace``.
+
+    Non-interactive steps never prompt: the script is written from an
+    ``idea`` artifact and the first suggested title is used. ``auto``
+    doesn't prompt either, but has the model pick the idea itself from a
+    ``seed`` artifact: a new seed draws a new plan and the same seed
+    repeats the recorded one.
+    """
+    ws = workspace
+    if auto:
+        first = Node("auto_ideation", partial(ideation, out_dir=ws.inputs, auto=True), ("seed",), ("script",))
+    elif interactive:
+        first = Node("ideation", partial(ideation, out_dir=ws.inputs), (), ("script",))
+    else:
+        first = Node("ideation", partial(ideation_from, out_dir=ws.inputs), ("idea",), ("script",))
+    return [
+        first,
+        Node("audio", partial(audio, out_dir=ws.audio), ("script", "tts"), ("audio",)),
+        Node("transcription", partial(transcription, out_dir=ws.transcripts), ("audio", "stt"), ("transcript",)),
+        Node("storyboard", partial(storyboard, out_dir=ws.images), ("script", "n_images"), ("images",)),
+        Node(
+            "metadata",
+            partial(metadata, out_dir=ws.final, choice=None if interactive and not auto else 1),
+            ("script",),
+            ("metadata",),
+        ),
+        Node(
+            "video",
+            partial(video, out_dir=ws.final),
+            ("audio", "images", "transcript", "render"),
+            ("video",),
+            kind="cpu",
+        ),
+    ]
+
+
+STEPS = make_steps()
+
+PIPELINE = Pipeline(STEPS)
@@ -0,0 +1,476 @@
+import math
+import os
+import re
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import tracing
+from motion import zoompan_filter
+from transitions import clip_starts, scene_fades
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from frames import ZipMember
+    from motion import Motion
+    from transitions import Transition
+
+FPS = 30
+WIDTH, HEIGHT = 1920, 1080
+SCENE_DURATION = 3
+RENDERERS = ["moviepy", "ffmpeg", "parallel"]
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """Output size, frame rate and x264 settings for one kind of render."""
+
+    width: int
+    height: int
+    fps: int
+    preset: str
+    crf: int
+    tune: str | None = None
+    threads: int = os.cpu_count() or 1
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def x264_options(self) -> list[str]:
+        """Encoder options besides the codec, preset and thread count, which moviepy sets itself."""
+        return ["-crf", str(self.crf), *(["-tune", self.tune] if self.tune else [])]
+
+    def moving(self) -> "RenderProfile":
+        """This profile for scenes that pan or zoom, which ``-tune stillimage`` is tuned against."""
+        return replace(self, tune=None) if self.tune == "stillimage" else self
+
+    def encoder_args(self, threads: int | None = None) -> list[str]:
+        return [
+            "-c:v", "libx264", "-preset", self.preset, *self.x264_options(),
+            "-threads", str(threads or self.threads),
+        ]
+
+
+# Drafts are for checking timing and captions, so they trade quality for
+# encode speed. Each scene is a still, so little motion search is needed:
+# veryfast at CRF 21 encoded about twice as fast as x264's defaults (medium,
+# CRF 23) in benchmarks/bench_profiles.py, at a smaller size.
+PROFILES = {
+    "draft": RenderProfile(640, 360, 15, "ultrafast", 30),
+    "final": RenderProfile(WIDTH, HEIGHT, FPS, "veryfast", 21, tune="stillimage"),
+}
+
+
+def ffmpeg_exe() -> str:
+    """Path of the ffmpeg binary moviepy uses, falling back to the one on PATH."""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+
+def run_ffmpeg(args: list[str], on_frame: Callable[[int], None] | None = None) -> None:
+    """Run ffmpeg, calling ``on_frame(n)`` as its ``-progress`` output reports frames encoded."""
+    out = Path(args[-1])
+    with tracing.span("ffmpeg", "encode", output=out.name) as span:
+        if on_frame is None:
+            proc = subprocess.run([ffmpeg_exe(), "-hide_banner", "-y", *args], capture_output=True, text=True)
+            stderr = proc.stderr
+        else:
+            with tempfile.TemporaryFile("w+") as err:
+                proc = subprocess.Popen(
+                    [ffmpeg_exe(), "-hide_banner", "-y", "-nostats", "-progress", "pipe:1", *args],
+                    stdout=subprocess.PIPE, stderr=err, text=True,
+                )
+                for line in proc.stdout:
+                    if line.startswith("frame="):
+                        on_frame(int(line[6:]))
+                proc.wait()
+                err.seek(0)
+                stderr = err.read()
+        if proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed: {stderr.strip()[-2000:]}")
+        span.set(bytes=tracing.file_bytes(out))
+
+
+def output_length(durations: list[float], fps: int, audio_path: Path) -> str:
+    """``-t`` value cutting the video to the shorter of the slideshow and the narration.
+
+    Unlike ``-shortest``, which stops at whatever packet the muxer has
+    buffered when the first stream ends, this cuts on the same frame for
+    every renderer, including when the video is stream-copied.
+    """
+    return f"{min(frame_boundaries(durations, fps)[-1] / fps, probe_duration(audio_path)):.6f}"
+
+
+def probe_duration(path: str | Path) -> float:
+    """Container duration in seconds, read from ffmpeg's stream summary."""
+    proc = subprocess.run([ffmpeg_exe(), "-hide_banner", "-i", str(path)], capture_output=True, text=True)
+    match = re.search(r"Duration: (\d+):(\d+):(\d+\.\d+)", proc.stderr)
+    if not match:
+        raise RuntimeError(f"Could not read duration of {path}")
+    h, m, s = match.groups()
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def filter_path(path: str | Path) -> str:
+    """Escape a file path for use as an ffmpeg filter option value inside a filtergraph."""
+    value = Path(path).resolve().as_posix()
+    for ch in "\\':":
+        value = value.replace(ch, "\\" + ch)
+    for ch in "\\'[],;":
+        value = value.replace(ch, "\\" + ch)
+    return value
+
+
+def subtitle_filter(subtitles: Path | None, offset: float = 0.0) -> str:
+    """Filter chain suffix burning in ``subtitles``, shifted for a segment starting at ``offset``."""
+    if not subtitles:
+        return ""
+    burn = f"{'ass' if Path(subtitles).suffix == '.ass' else 'subtitles'}={filter_path(subtitles)}"
+    if offset:
+        return f",setpts=PTS+{offset:.6f}/TB,{burn},setpts=PTS-STARTPTS"
+    return f",{burn}"
+
+
+def render_moviepy(
+    frames: "list[np.ndarray]",
+    durations: list[float],
+    audio_path: Path,
+    out_path: Path,
+    profile: RenderProfile = PROFILES["final"],
+    subtitles: Path | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> Path:
+    """Composite pre-normalised frames with moviepy."""
+    import moviepy.editor as mp
+    import proglog
+
+    clips = [mp.ImageClip(frame).set_duration(duration) for frame, duration in zip(frames, durations)]
+
+    video = mp.concatenate_videoclips(clips, method="compose")
+    audio = mp.AudioFileClip(str(audio_path))
+    final_duration = min(video.duration, audio.duration)
+    video = video.set_audio(audio.subclip(0, final_duration)).set_duration(final_duration)
+    ffmpeg_params = profile.x264_options()
+    if subtitles:
+        ffmpeg_params += ["-vf", subtitle_filter(subtitles).lstrip(",")]
+    logger = "bar"
+    if on_progress:
+        total = round(final_duration * profile.fps)
+
+        class FrameLogger(proglog.ProgressBarLogger):
+            def bars_callback(self, bar, attr, value, old_value=None):
+                if bar == "t" and attr == "index":
+                    on_progress(min(value + 1, total), total)
+
+        logger = FrameLogger()
+    video.write_videofile(
+        str(out_path), fps=profile.fps, codec="libx264", audio_codec="aac",
+        preset=profile.preset, threads=profile.threads, ffmpeg_params=ffmpeg_params, logger=logger,
+    )
+    return out_path
+
+
+def concat_list(images: list[Path], durations: list[float]) -> str:
+    """Build an ffmpeg concat-demuxer script showing each still for its duration."""
+    lines = []
+    for img_file, duration in zip(images, durations):
+        lines.append(f"file '{Path(img_file).resolve().as_posix()}'")
+        lines.append(f"duration {duration:.6f}")
+    # The demuxer ignores the last duration unless the final file is listed again.
+    lines.append(f"file '{Path(images[-1]).resolve().as_posix()}'")
+    return "\n".join(lines) + "\n"
+
+
+def scene_video(
+    stills: list[Path],
+    durations: list[float],
+    profile: RenderProfile,
+    tmp: Path,
+    tail: str = "",
+    motion: "list[Motion] | None" = None,
+    fades: list[tuple[str, int]] | None = None,
+) -> tuple[list[str], str]:
+    """Input arguments and a filter graph producing the scenes as one stream labelled ``[v]``.
+
+    With neither ``motion`` nor ``fades`` the concat demuxer shows each
+    still for its duration and ffmpeg just repeats the decoded frame.
+    Otherwise every still is its own input, decoded once and held (or
+    animated by zoompan) for its clip's frames, and the clips are joined
+    by the concat filter or, with ``fades`` from
+    :func:`transitions.scene_fades`, an xfade chain. Either way no
+    per-frame work happens in Python. ``tail`` is appended to the joined
+    stream's filter chain.
+    """
+    if not motion and not fades:
+        list_file = tmp / "scenes.txt"
+        list_file.write_text(concat_list(stills, durations))
+        inputs = ["-f", "concat", "-safe", "0", "-i", str(list_file)]
+        return inputs, f"[0:v]setsar=1,fps={profile.fps}{tail},format=yuv420p[v]"
+    fps = profile.fps
+    bounds = frame_boundaries(durations, fps)
+    fades = fades or [("fade", 0)] * len(stills)
+    starts = clip_starts(bounds, fades)
+    # Scenes joined by transitions form an xfade chain, whose offsets count
+    # from the chain's first frame, and hard cuts concat the chains: xfade
+    # needs a constant frame rate, which concat drops, and a zero-length
+    # xfade doesn't retime the incoming clip.
+    inputs, chains, groups = [], [], []
+    for i, still in enumerate(stills):
+        n_frames = bounds[i + 1] - starts[i]
+        if not n_frames:
+            continue
+        k = inputs.count("-i")
+        if motion:
+            inputs += ["-i", str(still)]
+            clip = zoompan_filter(motion[i], n_frames, profile.size, fps)
+        else:
+            inputs += ["-framerate", str(fps), "-i", str(still)]
+            clip = f"tpad=stop={n_frames - 1}:stop_mode=clone,setsar=1"
+        chains.append(f"[{k}:v]{clip}[s{k}]")
+        kind, frames = fades[i]
+        if frames and groups:
+            label, start = groups[-1]
+            chains.append(
+                f"{label}[s{k}]xfade=transition={kind}:duration={frames / fps:.6f}"
+                f":offset={(starts[i] - start) / fps:.6f}[x{k}]"
+            )
+            groups[-1] = f"[x{k}]", start
+        else:
+            groups.append((f"[s{k}]", starts[i]))
+    labels = "".join(label for label, _ in groups)
+    joined = f"{labels}concat=n={len(groups)}:v=1:a=0" if len(groups) > 1 else f"{labels}null"
+    if starts[0] < 0:
+        # A segment's fade-in from the previous scene was encoded with the previous segment.
+        joined += f",trim=start_frame={-starts[0]},setpts=PTS-STARTPTS"
+    chains.append(f"{joined}{tail},format=yuv420p[v]")
+    return inputs, ";".join(chains)
+
+
+def render_ffmpeg(
+    stills: list[Path],
+    durations: list[float],
+    audio_path: Path,
+    out_path: Path,
+    profile: RenderProfile = PROFILES["final"],
+    subtitles: Path | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+    motion: "list[Motion] | None" = None,
+    transitions: "list[Transition] | None" = None,
+) -> Path:
+    """Encode pre-normalised stills and narration in a single ffmpeg pass.
+
+    Captions in ``subtitles`` are burned in by libass during the same
+    pass, after any ``motion`` and ``transitions``. The output is cut to
+    the shorter of the slideshow and the narration, like the moviepy path.
+    """
+    if motion:
+        profile = profile.moving()
+    bounds = frame_boundaries(durations, profile.fps)
+    fades = scene_fades(transitions, bounds, profile.fps) if transitions else None
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs, graph = scene_video(stills, durations, profile, Path(tmp), subtitle_filter(subtitles), motion, fades)
+        n_inputs = inputs.count("-i")
+        total = bounds[-1]
+        on_frame = (lambda n: on_progress(min(n, total), total)) if on_progress else None
+        run_ffmpeg([
+            *inputs,
+            "-i", str(audio_path),
+            "-filter_complex", graph,
+            "-map", "[v]", "-map", f"{n_inputs}:a",
+            *profile.encoder_args(), "-c:a", "aac",
+            "-t", output_length(durations, profile.fps, audio_path),
+            str(out_path),
+        ], on_frame=on_frame)
+    return out_path
+
+
+def frame_boundaries(durations: list[float], fps: int = FPS) -> list[int]:
+    """Frame index at which each scene starts, plus the total frame count.
+
+    Rounding the cumulative time (not each duration) keeps segment cuts on
+    the same frames the single-pass encode would show, with no drift.
+    """
+    bounds, t = [0], 0.0
+    for d in durations:
+        t += d
+        bounds.append(round(t * fps))
+    return bounds
+
+
+def split_segments(n_scenes: int, segment_scenes: int) -> list[range]:
+    return [range(i, min(i + segment_scenes, n_scenes)) for i in range(0, n_scenes, segment_scenes)]
+
+
+def encode_segment(
+    stills: list[Path],
+    durations: list[float],
+    n_frames: int,
+    out_path: Path,
+    profile: RenderProfile,
+    threads: int,
+    subtitles: Path | None = None,
+    offset: float = 0.0,
+    motion: "list[Motion] | None" = None,
+    fades: list[tuple[str, int]] | None = None,
+) -> Path:
+    """Encode one video-only segment with the same encoder settings as the single pass.
+
+    ``offset`` is the segment's start on the full timeline, used to line
+    the captions up with the segment's frames. With ``fades``, ``stills``
+    ends with the next segment's first scene, which this segment fades
+    into and which ``n_frames`` cuts off.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tail = subtitle_filter(subtitles, offset)
+        inputs, graph = scene_video(stills, durations, profile, Path(tmp), tail, motion, fades)
+        run_ffmpeg([
+            *inputs,
+            "-filter_complex", graph, "-map", "[v]",
+            "-frames:v", str(n_frames), "-r", str(profile.fps),
+            *profile.encoder_args(threads),
+            "-an", str(out_path),
+        ])
+    return out_path
+
+
+def render_parallel(
+    stills: list[Path],
+    durations: list[float],
+    audio_path: Path,
+    out_path: Path,
+    profile: RenderProfile = PROFILES["final"],
+    workers: int | None = None,
+    segment_scenes: int | None = None,
+    subtitles: Path | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+    motion: "list[Motion] | None" = None,
+    transitions: "list[Transition] | None" = None,
+) -> Path:
+    """Encode scene-aligned segments in a process pool, then join them without re-encoding.
+
+    Segments are cut on scene boundaries and sized to whole frames, so the
+    stream-copied result has the same frames and length as
+    :func:`render_ffmpeg`. A transition across a cut is encoded by the
+    segment before it, which also renders the start of the next scene.
+    The narration is muxed once at the end.
+    """
+    if motion:
+        profile = profile.moving()
+    workers = workers or os.cpu_count() or 1
+    segment_scenes = segment_scenes or max(1, math.ceil(len(stills) / workers))
+    fps = profile.fps
+    bounds = frame_boundaries(durations, fps)
+    fades = scene_fades(transitions, bounds, fps) if transitions else None
+    threads = max(1, profile.threads // workers)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        jobs = []
+        for n, seg in enumerate(split_segments(len(stills), segment_scenes)):
+            n_frames = bounds[seg.stop] - bounds[seg.start]
+            if not n_frames:
+                continue
+            if fades and seg.stop < len(stills) and fades[seg.stop][1]:
+                seg = range(seg.start, seg.stop + 1)
+            seg_durations = [(bounds[i + 1] - bounds[i]) / fps for i in seg]
+            segment = tmp / f"segment_{n:04d}.mp4"
+            offset = bounds[seg.start] / fps
+            seg_motion = [motion[i] for i in seg] if motion else None
+            seg_fades = [fades[i] for i in seg] if fades else None
+            jobs.append((
+                [stills[i] for i in seg], seg_durations, n_frames, segment, profile, threads, subtitles, offset,
+                seg_motion, seg_fades,
+            ))
+        with ProcessPoolExecutor(workers) as pool:
+            futures = {pool.submit(encode_segment, *job): job[2] for job in jobs}
+            done = 0
+            for fut in as_completed(futures):
+                fut.result()
+                done += futures[fut]
+                if on_progress:
+                    on_progress(done, bounds[-1])
+        segments = [job[3] for job in jobs]
+        list_file = tmp / "segments.txt"
+        list_file.write_text("".join(f"file '{p.as_posix()}'\n" for p in segments))
+        run_ffmpeg([
+            "-f", "concat", "-safe", "0", "-i", str(list_file),
+            "-i", str(audio_path),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy", "-c:a", "aac",
+            "-t", output_length(durations, fps, audio_path),
+            str(out_path),
+        ])
+    return out_path
+
+
+def render(
+    renderer: str,
+    images: "list[Path | ZipMember]",
+    durations: list[float],
+    audio_path: Path,
+    out_path: Path,
+    workers: int | None = None,
+    segment_scenes: int | None = None,
+    subtitles: Path | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+    profile: str = "final",
+    motion: "list[Motion] | None" = None,
+    transitions: "list[Transition] | None" = None,
+) -> Path:
+    """Normalise ``images`` to the output canvas (cached) and render them with ``renderer``.
+
+    ``images`` may be files or members of the storyboard ZIP, which are
+    decoded in place. ``subtitles`` is an ``.ass``/``.srt`` file to burn in. ``workers`` and
+    ``segment_scenes`` only apply to the ``parallel`` renderer. ``profile``
+    names an entry of :data:`PROFILES`, which sets the size, frame rate
+    and encoder settings. ``motion`` gives each scene a pan/zoom and
+    ``transitions`` blend each scene into the next; ffmpeg computes both,
+    so they need the ``ffmpeg`` or ``parallel`` renderer.
+    ``on_progress(frames_done, frames_total)`` is called as encoding advances;
+    the parallel renderer reports once per finished segment.
+    """
+    from frames import frame_cache
+
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer {renderer!r}; choose from {', '.join(RENDERERS)}")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown render profile {profile!r}; choose from {', '.join(PROFILES)}")
+    if motion and renderer == "moviepy":
+        raise ValueError("Scene motion needs the ffmpeg or parallel renderer")
+    if transitions and all(t.kind == "cut" for t in transitions):
+        transitions = None
+    if transitions and renderer == "moviepy":
+        raise ValueError("Scene transitions need the ffmpeg or parallel renderer")
+    settings = PROFILES[profile]
+    size = settings.size
+    with tracing.span("frames", "decode", images=len(images)):
+        frames = frame_cache.arrays(images, size) if renderer == "moviepy" else frame_cache.stills(images, size)
+    frame_count = frame_boundaries(durations, settings.fps)[-1]
+    with tracing.span(
+        "render", "encode", renderer=renderer, profile=profile, frames=frame_count, motion=bool(motion),
+        transitions=bool(transitions),
+    ) as span:
+        if renderer == "ffmpeg":
+            render_ffmpeg(
+                frames, durations, audio_path, out_path, settings,
+                subtitles=subtitles, on_progress=on_progress, motion=motion, transitions=transitions,
+            )
+        elif renderer == "parallel":
+            render_parallel(
+                frames, durations, audio_path, out_path, settings,
+                workers=workers, segment_scenes=segment_scenes, subtitles=subtitles, on_progress=on_progress,
+                motion=motion, transitions=transitions,
+            )
+        else:
+            render_moviepy(
+                frames, durations, audio_path, out_path, settings, subtitles=subtitles, on_progress=on_progress
+            )
+        span.set(bytes=tracing.file_bytes(out_path))
+    return out_path
@@ -0,0 +1,42 @@
+import json
+import re
+
+# A list item line: "1. item", "2) item", "- item", "* item" or "• item".
+_ITEM = re.compile(r"^\s*(?:\d+[.):]|[-*•])\s+(.+)$")
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def parse_list(reply: str) -> list[str]:
+    """The items of a list ``reply`` without their numbering, bullets, bold or quotes.
+
+    When some lines are marked as list items, lines around them such as
+    "Here are 5 ideas:" are dropped; otherwise every non-blank line is an item.
+    """
+    lines = [line for line in reply.splitlines() if line.strip()]
+    marked = [m.group(1) for m in map(_ITEM.match, lines) if m]
+    items = [re.sub(r"\*\*|__", "", item).strip().strip('"').strip() for item in marked or lines]
+    return [item for item in items if item]
+
+
+def parse_json(reply: str, fields: dict[str, type]) -> dict:
+    """The JSON object in ``reply``, checked to have every one of ``fields`` with its type.
+
+    A ``str`` field must not be blank and a ``list`` field must be a
+    non-empty list of strings, which are stripped. Raises ``ValueError``
+    describing the first problem found.
+    """
+    data = json.loads(_FENCE.sub("", reply.strip()))
+    if not isinstance(data, dict):
+        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+    parsed = {}
+    for name, kind in fields.items():
+        value = data.get(name)
+        if kind is list:
+            if not isinstance(value, list) or not value or not all(isinstance(v, str) and v.strip() for v in value):
+                raise ValueError(f"{name!r} should be a non-empty list of strings")
+            parsed[name] = [v.strip() for v in value]
+        elif not isinstance(value, kind) or (kind is str and not value.strip()):
+            raise ValueError(f"{name!r} should be a non-empty {kind.__name__}")
+        else:
+            parsed[name] = value.strip() if kind is str else value
+    return parsed
@@ -0,0 +1,125 @@
+import contextvars
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+import api_cache
+import tracing
+
+if TYPE_CHECKING:
+    from frames import ZipMember
+
+MAX_IN_FLIGHT = 4
+# Pillow save options per storyboard format; None keeps the PNG the API returns.
+FORMATS = {
+    "png": None,
+    "webp": {"format": "WEBP", "lossless": True, "quality": 100, "method": 4},
+}
+
+
+def scene_prompt(script_text: str, index: int) -> str:
+    return f"{script_text}\nScene {index + 1}" if script_text else f"Scene {index + 1}"
+
+
+def scene_name(index: int, image_format: str = "png") -> str:
+    return f"scene_{index + 1:03d}.{image_format}"
+
+
+def scene_path(out_dir: Path, index: int, image_format: str = "png") -> Path:
+    return out_dir / scene_name(index, image_format)
+
+
+def transcode(data: bytes, image_format: str) -> bytes:
+    """Re-encode PNG bytes from the API as ``image_format``."""
+    options = FORMATS[image_format]
+    if options is None:
+        return data
+    from PIL import Image
+
+    buf = io.BytesIO()
+    with Image.open(io.BytesIO(data)) as img:
+        img.save(buf, **options)
+    return buf.getvalue()
+
+
+def generate_scene(prompt: str, image_format: str = "png") -> bytes:
+    """Generate one image and return it encoded as ``image_format``.
+
+    ``api_client.call`` already retries the request where that can help.
+    """
+    with tracing.span("scene", "storyboard", format=image_format) as span:
+        data = transcode(api_cache.image(prompt), image_format)
+        span.set(bytes=len(data))
+        return data
+
+
+def generate_storyboard(
+    script_text: str,
+    n_images: int,
+    out_dir: Path,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    on_saved: "Callable[[Path | ZipMember], None] | None" = None,
+    archive: Path | None = None,
+    image_format: str = "png",
+) -> "list[Path | ZipMember]":
+    """Generate ``n_images`` scenes with at most ``max_in_flight`` requests running at once.
+
+    Each scene is written exactly once, as soon as it arrives: to
+    ``out_dir`` as ``scene_001.png``, ``scene_002.png``..., or, with
+    ``archive``, appended to that ZIP (which then replaces any previous
+    one) without touching ``out_dir``. The returned list is in scene order
+    regardless of completion order. Scenes that fail (after the API
+    client's own retries) are reported together once every other scene
+    has finished, so successful images are never thrown away.
+    """
+    if image_format not in FORMATS:
+        raise ValueError(f"Unknown image format {image_format!r}; choose from {', '.join(FORMATS)}")
+    max_in_flight = max(1, min(max_in_flight, n_images))
+    scenes: "list[Path | ZipMember | None]" = [None] * n_images
+    failures = {}
+    if archive:
+        from frames import ZipMember
+
+        part = archive.with_name(f"{archive.name}.part")
+        archive.parent.mkdir(parents=True, exist_ok=True)
+        # PNG and WebP are already compressed, so members are stored as-is.
+        sink = zipfile.ZipFile(part, "w", compression=zipfile.ZIP_STORED)
+    else:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        with ThreadPoolExecutor(max_in_flight) as pool:
+            futures = {
+                pool.submit(
+                    contextvars.copy_context().run, generate_scene, scene_prompt(script_text, i), image_format
+                ): i
+                for i in range(n_images)
+            }
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    data = fut.result()
+                except Exception as e:
+                    failures[i + 1] = e
+                    continue
+                if archive:
+                    sink.writestr(scene_name(i, image_format), data)
+                    scenes[i] = ZipMember(archive, scene_name(i, image_format))
+                else:
+                    scenes[i] = scene_path(out_dir, i, image_format)
+                    scenes[i].write_bytes(data)
+                if on_saved:
+                    on_saved(scenes[i])
+    finally:
+        if archive:
+            sink.close()
+    if failures:
+        if archive:
+            part.unlink()
+        detail = ", ".join(f"scene {n}: {e}" for n, e in sorted(failures.items()))
+        raise RuntimeError(f"{len(failures)} of {n_images} scenes failed ({detail})")
+    if archive:
+        os.replace(part, archive)
+    return scenes
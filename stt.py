@@ -0,0 +1,104 @@
+import contextvars
+import re
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+import api_cache
+from render import ffmpeg_exe, probe_duration, run_ffmpeg
+
+WINDOW = 120.0
+OVERLAP = 2.0
+MAX_IN_FLIGHT = 4
+SILENCE_DB = -35
+SILENCE_MIN = 0.3
+
+
+def detect_silences(audio_file: str | Path, noise_db: int = SILENCE_DB, min_len: float = SILENCE_MIN) -> np.ndarray:
+    """Midpoints of the silent stretches ffmpeg's ``silencedetect`` finds."""
+    proc = subprocess.run(
+        [ffmpeg_exe(), "-hide_banner", "-i", str(audio_file),
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_len}", "-f", "null", "-"],
+        capture_output=True, text=True,
+    )
+    starts = [float(v) for v in re.findall(r"silence_start: (-?[\d.]+)", proc.stderr)]
+    ends = [float(v) for v in re.findall(r"silence_end: ([\d.]+)", proc.stderr)]
+    n = min(len(starts), len(ends))
+    return (np.array(starts[:n]) + np.array(ends[:n])) / 2
+
+
+def plan_cuts(total: float, silences: np.ndarray, window: float = WINDOW) -> np.ndarray:
+    """Cut times (including 0 and ``total``) roughly ``window`` apart, moved into nearby silences.
+
+    A cut only snaps to a silence within a quarter window of its target, so
+    no window grows much beyond ``window``.
+    """
+    targets = np.arange(window, total, window)
+    if len(targets) and total - targets[-1] < window / 4:
+        targets = targets[:-1]
+    cuts = targets.copy()
+    if len(silences) and len(targets):
+        idx = np.clip(np.searchsorted(silences, targets), 1, len(silences)) - 1
+        right = np.minimum(idx + 1, len(silences) - 1)
+        nearest = np.where(np.abs(silences[right] - targets) < np.abs(silences[idx] - targets), right, idx)
+        snapped = silences[nearest]
+        cuts = np.where(np.abs(snapped - targets) <= window / 4, snapped, targets)
+    return np.unique(np.concatenate(([0.0], cuts, [total])))
+
+
+def merge_words(cuts: np.ndarray, starts: list[float], word_lists: list[list[dict]]) -> list[dict]:
+    """Shift each window's words onto the global timeline and drop overlap duplicates.
+
+    Window ``k`` owns the span ``[cuts[k], cuts[k + 1])``; a word is kept
+    only by the window owning its midpoint, so words heard in two
+    overlapping windows appear once.
+    """
+    merged = []
+    for k, (offset, words) in enumerate(zip(starts, word_lists)):
+        for w in words:
+            start, end = w["start"] + offset, w["end"] + offset
+            mid = (start + end) / 2
+            if cuts[k] <= mid < cuts[k + 1] or (k == len(word_lists) - 1 and mid >= cuts[k]):
+                merged.append({"word": w["word"], "start": round(start, 3), "end": round(end, 3)})
+    return merged
+
+
+def transcribe_chunked(
+    audio_file: str | Path,
+    window: float = WINDOW,
+    overlap: float = OVERLAP,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    on_window: Callable[[int, int], None] | None = None,
+) -> list[dict]:
+    """Transcribe ``audio_file`` in overlapping windows cut at silences, concurrently.
+
+    Windows are re-encoded to 16 kHz mono MP3, which keeps every upload
+    small, and each goes through the API cache keyed on its own audio.
+    ``on_window(done, n)`` is called as each window finishes.
+    """
+    total = probe_duration(audio_file)
+    cuts = plan_cuts(total, detect_silences(audio_file), window)
+    spans = [(max(0.0, a - overlap), min(total, b + overlap)) for a, b in zip(cuts[:-1], cuts[1:])]
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def transcribe_window(k: int) -> list[dict]:
+            a, b = spans[k]
+            part = Path(tmp) / f"window_{k:04d}.mp3"
+            run_ffmpeg([
+                "-ss", f"{a:.3f}", "-t", f"{b - a:.3f}", "-i", str(audio_file),
+                "-ac", "1", "-ar", "16000", "-c:a", "libmp3lame", "-b:a", "48k", str(part),
+            ])
+            return api_cache.transcribe_words(part)
+
+        word_lists: list[list[dict]] = [[] for _ in spans]
+        with ThreadPoolExecutor(max(1, max_in_flight)) as pool:
+            futures = {pool.submit(contextvars.copy_context().run, transcribe_window, k): k for k in range(len(spans))}
+            for done, fut in enumerate(as_completed(futures), 1):
+                word_lists[futures[fut]] = fut.result()
+                if on_window:
+                    on_window(done, len(spans))
+    return merge_words(cuts, [a for a, _ in spans], word_lists)
@@ -0,0 +1,62 @@
+import os
+import time
+import zipfile
+
+from common import make_storyboard
+
+from frames import FrameCache, ZipMember, zip_members
+
+SIZE = (64, 36)
+
+
+def age(path, days: float):
+    then = time.time() - days * 86400
+    os.utime(path, (then, then))
+
+
+def test_evicts_least_recently_used_beyond_max_bytes(tmp_path):
+    images = make_storyboard(tmp_path / "images", 3, 128)
+    cache = FrameCache(tmp_path / "frames")
+    old, used, new = cache.stills(images, SIZE)
+    age(old, 2)
+    age(used, 3)
+    cache.still_path(images[1], SIZE)
+    cache.max_bytes = new.stat().st_size + used.stat().st_size
+    cache.evict()
+    assert not old.exists() and used.exists() and new.exists()
+
+
+def test_evicts_entries_unused_for_max_age(tmp_path):
+    images = make_storyboard(tmp_path / "images", 2, 128)
+    cache = FrameCache(tmp_path / "frames", max_age=86400)
+    stale, fresh = cache.stills(images, SIZE)
+    age(stale, 2)
+    age(fresh, 2)
+    cache.still_path(images[1], SIZE)
+    cache.evict()
+    assert not stale.exists() and fresh.exists()
+
+
+def test_keeps_the_batch_it_just_produced(tmp_path):
+    images = make_storyboard(tmp_path / "images", 3, 128)
+    cache = FrameCache(tmp_path / "frames", max_bytes=0)
+    stills = cache.stills(images, SIZE)
+    assert all(path.exists() for path in stills)
+    cache.stills(images[:1], SIZE)
+    assert stills[0].exists() and not stills[1].exists() and not stills[2].exists()
+
+
+def test_zip_member_is_read_once_and_shares_the_files_key(tmp_path, monkeypatch):
+    images = make_storyboard(tmp_path / "images", 2, 128)
+    archive = tmp_path / "storyboard.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        for image in images:
+            z.write(image, image.name)
+    opened = []
+    open_member = ZipMember.open
+    monkeypatch.setattr(ZipMember, "open", lambda self: opened.append(self.name) or open_member(self))
+    cache = FrameCache(tmp_path / "frames")
+    members = zip_members(archive)
+    stills = cache.stills(members, SIZE)
+    assert sorted(opened) == [image.name for image in images]
+    assert cache.stills(images, SIZE) == stills
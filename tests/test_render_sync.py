@@ -0,0 +1,44 @@
+import pytest
+from common import make_narration, make_storyboard, stream_duration
+
+from frames import FrameCache
+from render import PROFILES, frame_boundaries, probe_duration, render_ffmpeg, render_parallel
+from transitions import plan_transitions
+
+PROFILE = PROFILES["draft"]
+FRAME = 1 / PROFILE.fps
+DURATIONS = [0.9, 1.3, 0.4, 1.45, 0.07, 1.0]
+
+
+@pytest.fixture(scope="module")
+def stills(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("storyboard")
+    images = make_storyboard(tmp / "images", len(DURATIONS), 256)
+    return FrameCache(tmp / "frames").stills(images, PROFILE.size)
+
+
+def render(renderer: str, stills, audio, out, transitions):
+    if renderer == "parallel":
+        render_parallel(stills, DURATIONS, audio, out, PROFILE, workers=2, segment_scenes=2, transitions=transitions)
+    else:
+        render_ffmpeg(stills, DURATIONS, audio, out, PROFILE, transitions=transitions)
+
+
+@pytest.mark.parametrize("transitions", [None, "fade:0.3"])
+@pytest.mark.parametrize("audio_extra", [0.6, -0.6], ids=["longer-audio", "shorter-audio"])
+def test_parallel_render_matches_single_pass(stills, tmp_path, transitions, audio_extra):
+    slideshow = frame_boundaries(DURATIONS, PROFILE.fps)[-1] / PROFILE.fps
+    audio = make_narration(tmp_path / "narration.mp3", slideshow + audio_extra)
+    plan = plan_transitions([transitions], len(DURATIONS)) if transitions else None
+    # MP3 encoding pads the narration a little; the renderers cut to its real length.
+    expected = min(slideshow, probe_duration(audio))
+    lengths = {}
+    for renderer in ("ffmpeg", "parallel"):
+        out = tmp_path / f"{renderer}.mp4"
+        render(renderer, stills, audio, out, plan)
+        video, sound = stream_duration(out, "v"), stream_duration(out, "a")
+        assert video == pytest.approx(expected, abs=FRAME), renderer
+        assert sound == pytest.approx(expected, abs=FRAME), renderer
+        assert abs(video - sound) <= FRAME, renderer
+        lengths[renderer] = video, sound
+    assert lengths["parallel"] == pytest.approx(lengths["ffmpeg"], abs=FRAME)
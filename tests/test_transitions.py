@@ -0,0 +1,97 @@
+import pytest
+
+from render import frame_boundaries
+from transitions import Transition, clip_starts, plan_transitions, scene_fades
+
+FPS = 30
+
+
+def joined_length(bounds: list[int], fades: list[tuple[str, int]]) -> int:
+    """Frames an xfade chain of the clips lasts: their lengths less the frames each fade overlaps."""
+    starts = clip_starts(bounds, fades)
+    clips = [bounds[i + 1] - starts[i] for i in range(len(starts))]
+    return sum(clips) - sum(frames for _, frames in fades[1:]) + min(0, starts[0])
+
+
+def test_plan_transitions_cycles_specs_with_own_lengths():
+    plan = plan_transitions(["fade", "dissolve:1.5", "cut:2"], 5, seconds=0.4)
+    assert plan == [
+        Transition("fade", 0.4), Transition("dissolve", 1.5), Transition("cut", 0.0), Transition("fade", 0.4),
+    ]
+    assert plan_transitions(["fade"], 1) == []
+
+
+@pytest.mark.parametrize("specs", [["spin"], ["fade:x"], ["fade:-1"], []])
+def test_plan_transitions_rejects_bad_specs(specs):
+    with pytest.raises(ValueError):
+        plan_transitions(specs, 3)
+
+
+def test_cuts_have_no_overlap():
+    bounds = frame_boundaries([2.0, 2.0, 2.0], FPS)
+    fades = scene_fades(plan_transitions(["cut"], 3), bounds, FPS)
+    assert fades == [("fade", 0)] * 3
+    assert clip_starts(bounds, fades) == bounds[:-1]
+
+
+def test_fade_plays_over_the_end_of_the_previous_scene():
+    bounds = frame_boundaries([2.0, 2.0], FPS)
+    fades = scene_fades(plan_transitions(["wipeleft:0.5"], 2), bounds, FPS)
+    assert fades == [("fade", 0), ("wipeleft", 15)]
+    assert clip_starts(bounds, fades) == [0, 45]
+
+
+def test_zero_frame_scenes_become_cuts():
+    bounds = frame_boundaries([1.0, 0.01, 1.0], FPS)
+    assert bounds[2] == bounds[1]
+    fades = scene_fades(plan_transitions(["dissolve"], 3), bounds, FPS)
+    assert fades == [("fade", 0), ("fade", 0), ("fade", 0)]
+
+
+def test_fade_is_capped_at_half_the_previous_scene():
+    bounds = frame_boundaries([0.4, 2.0], FPS)
+    fades = scene_fades(plan_transitions(["fade:1"], 2), bounds, FPS)
+    assert fades[1] == ("fade", 6)
+
+
+def test_fade_is_capped_at_the_next_scene():
+    bounds = frame_boundaries([2.0, 0.2, 2.0], FPS)
+    fades = scene_fades(plan_transitions(["fade:1"], 3), bounds, FPS)
+    assert fades[1] == ("fade", 6)
+    assert fades[2] == ("fade", 3)
+
+
+@pytest.mark.parametrize("durations", [[0.3, 0.3, 0.3], [0.1, 3.0, 0.05, 0.5], [1.0] * 6])
+def test_every_scene_is_fully_on_screen_for_half_its_length(durations):
+    bounds = frame_boundaries(durations, FPS)
+    fades = scene_fades(plan_transitions(["fade:2"], len(durations)), bounds, FPS)
+    for i in range(len(durations) - 1):
+        frames = bounds[i + 1] - bounds[i]
+        assert frames - fades[i + 1][1] >= frames / 2
+
+
+@pytest.mark.parametrize(
+    "durations, specs",
+    [
+        ([2.0, 2.0, 2.0], ["fade"]),
+        ([0.9, 1.3, 0.4, 1.4, 0.03, 1.0], ["dissolve:1", "wipeleft"]),
+        ([1.1, 0.7, 2.3, 0.5], ["cut", "fade:0.3"]),
+    ],
+)
+def test_clip_lengths_add_up_to_the_video(durations, specs):
+    bounds = frame_boundaries(durations, FPS)
+    fades = scene_fades(plan_transitions(specs, len(durations)), bounds, FPS)
+    assert joined_length(bounds, fades) == bounds[-1]
+
+
+def test_segment_lead_in_starts_before_zero():
+    # The parallel renderer encodes scenes 2-3 as a segment of their own,
+    # with the fade into scene 2 carried over from the full timeline.
+    bounds = frame_boundaries([2.0, 2.0, 2.0, 2.0], FPS)
+    fades = scene_fades(plan_transitions(["fade:0.5"], 4), bounds, FPS)
+    seg_bounds = [b - bounds[2] for b in bounds[2:]]
+    seg_fades = fades[2:]
+    starts = clip_starts(seg_bounds, seg_fades)
+    assert starts[0] == -15
+    # The segment trims its lead-in, so it lasts exactly its scenes' frames.
+    assert joined_length(seg_bounds, seg_fades) == seg_bounds[-1]
@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from tts import chunk_text, ends_chunk, split_sentences
+
+WORDS = "the a model video data chips cloud network fast new people will use build every year power cost".split()
+
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 30))).capitalize() + "."
+
+
+def extend(text: str, rng: random.Random) -> str:
+    """``text`` with a clause added to its last sentence."""
+    return text[:-1] + ", and " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8))) + "."
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_chunks_keep_every_word_within_the_limit(seed):
+    rng = random.Random(seed)
+    text = "\n\n".join(" ".join(sentence(rng) for _ in range(rng.randint(1, 20))) for _ in range(4))
+    chunks = chunk_text(text, 200)
+    assert all(0 < len(chunk) <= 200 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_editing_one_paragraph_leaves_the_others_chunks_alone(seed):
+    rng = random.Random(seed)
+    paragraphs = [" ".join(sentence(rng) for _ in range(15)) for _ in range(3)]
+    before = chunk_text("\n\n".join(paragraphs))
+    paragraphs[1] = extend(paragraphs[1], rng)
+    after = chunk_text("\n\n".join(paragraphs))
+    first, last = len(chunk_text(paragraphs[0])), len(chunk_text(paragraphs[2]))
+    assert after[:first] == before[:first]
+    assert after[-last:] == before[-last:]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_edit_moves_boundaries_only_up_to_the_next_picked_sentence(seed):
+    rng = random.Random(seed)
+    sentences = [sentence(rng) for _ in range(60)]
+    before = chunk_text(" ".join(sentences))
+    i = rng.randrange(10)
+    edited = extend(sentences[i], rng)
+    # Both versions close a chunk after the first sentence at or past the edit they both pick.
+    j = i if ends_chunk(sentences[i]) and ends_chunk(edited) else next(
+        j for j in range(i + 1, len(sentences)) if ends_chunk(sentences[j])
+    )
+    sentences[i] = edited
+    after = chunk_text(" ".join(sentences))
+    rest = len(chunk_text(" ".join(sentences[j + 1:])))
+    assert after[len(after) - rest:] == before[len(before) - rest:]
+    assert len(set(after) - set(before)) <= j - i + 1
+
+
+def test_sentence_over_the_limit_is_split_on_spaces():
+    text = "Short one. " + " ".join(["word"] * 50) + ". Tail."
+    chunks = chunk_text(text, 60)
+    assert all(len(chunk) <= 60 for chunk in chunks)
+    assert split_sentences(" ".join(chunks)) == split_sentences(text)
@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+TRACE_DIR = Path(os.getenv("TLDR_TRACE_DIR", "data/traces"))
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class Span:
+    """One timed operation. Attributes set on it end up in both exports."""
+
+    def __init__(self, name: str, category: str, attrs: dict):
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.tid = threading.get_ident()
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, **counts) -> None:
+        for k, v in counts.items():
+            self.attrs[k] = self.attrs.get(k, 0) + v
+
+
+class _NullSpan(Span):
+    def __init__(self):
+        super().__init__("", "", {})
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def add(self, **counts) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Series:
+    """Running totals for the spans of one category and name."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+        self.counters: dict[str, float] = {}
+
+    def observe(self, span: Span) -> None:
+        for i, bound in enumerate(BUCKETS):
+            self.buckets[i] += span.seconds <= bound
+        self.count += 1
+        self.seconds += span.seconds
+        for k, v in span.attrs.items():
+            if isinstance(v, (bool, int, float)):
+                self.counters[k] = self.counters.get(k, 0) + v
+
+
+class Tracer:
+    """Collects spans from every thread while ``enabled``; costs next to nothing otherwise.
+
+    Spans opened on the same thread nest. :meth:`current` is the innermost
+    open span of the calling thread, so code deep inside a step can
+    annotate it (tokens used, bytes written) without it being passed down.
+
+    Closed spans are kept for the Chrome trace only until the next
+    :meth:`export`; the metrics are running totals since the process
+    started. A long-lived worker can so export after every job without
+    holding on to every span it ever traced.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans: list[Span] = []
+        self._origin = time.perf_counter()
+        self._threads: dict[int, str] = {}
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._exports = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str = "step", **attrs) -> Iterator[Span]:
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        span = Span(name, category, attrs)
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.set(error=type(exc).__name__)
+            raise
+        finally:
+            span.seconds = time.perf_counter() - span.start
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+                self._threads.setdefault(span.tid, threading.current_thread().name)
+                self._series.setdefault((category, name), _Series()).observe(span)
+
+    def current(self) -> Span:
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else NULL_SPAN
+
+    def chrome_trace(self, clear: bool = False) -> dict:
+        """The spans as Chrome trace events, for chrome://tracing or Perfetto; ``clear`` drops them after."""
+        pid = os.getpid()
+        with self._lock:
+            spans, threads = list(self.spans), dict(self._threads)
+            if clear:
+                self.spans.clear()
+                self._threads.clear()
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        for s in spans:
+            events.append({
+                "name": s.name,
+                "cat": s.category,
+                "ph": "X",
+                "ts": round((s.start - self._origin) * 1e6),
+                "dur": round(s.seconds * 1e6),
+                "pid": pid,
+                "tid": s.tid,
+                "args": s.attrs,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def prometheus(self) -> str:
+        """Span durations as a histogram and numeric span attributes as counters, in Prometheus text format."""
+        with self._lock:
+            series = {key: (list(s.buckets), s.count, s.seconds, dict(s.counters)) for key, s in self._series.items()}
+        lines = [
+            "# HELP tldr_span_seconds Time spent in each traced operation.",
+            "# TYPE tldr_span_seconds histogram",
+        ]
+        counters: dict[str, dict[str, float]] = {}
+        for (category, name), (buckets, count, seconds, attrs) in sorted(series.items()):
+            labels = f'category="{category}",name="{name}"'
+            for bound, n in zip(BUCKETS, buckets):
+                lines.append(f'tldr_span_seconds_bucket{{{labels},le="{bound}"}} {n}')
+            lines.append(f'tldr_span_seconds_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f"tldr_span_seconds_sum{{{labels}}} {seconds:.6f}")
+            lines.append(f"tldr_span_seconds_count{{{labels}}} {count}")
+            for k, v in attrs.items():
+                counters.setdefault(k, {})[labels] = v
+        for attr, totals in sorted(counters.items()):
+            lines.append(f"# TYPE tldr_{attr}_total counter")
+            lines.extend(f"tldr_{attr}_total{{{labels}}} {value:.15g}" for labels, value in totals.items())
+        return "\n".join(lines) + "\n"
+
+    def export(self, out_dir: Path = TRACE_DIR) -> tuple[Path | None, Path]:
+        """Write the spans since the last export, if any, as a new Chrome trace and overwrite ``metrics.prom``."""
+        with self._export_lock:
+            out_dir.mkdir(parents=True, exist_ok=True)
+            trace = self.chrome_trace(clear=True)
+            trace_path = None
+            if any(event["ph"] == "X" for event in trace["traceEvents"]):
+                self._exports += 1
+                trace_path = out_dir / f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._exports}.json"
+                trace_path.write_text(json.dumps(trace))
+            metrics_path = out_dir / "metrics.prom"
+            tmp = metrics_path.with_suffix(".tmp")
+            tmp.write_text(self.prometheus())
+            tmp.replace(metrics_path)
+        return trace_path, metrics_path
+
+tracer = Tracer(enabled=os.getenv("TLDR_TRACE", "") not in ("", "0"))
+span = tracer.span
+current = tracer.current
+
+
+def file_bytes(value) -> int:
+    """Size of ``value`` on disk if it is a file or folder path, else 0."""
+    if not isinstance(value, Path):
+        return 0
+    if value.is_dir():
+        return sum(p.stat().st_size for p in value.rglob("*") if p.is_file())
+    return value.stat().st_size if value.is_file() else 0
@@ -0,0 +1,176 @@
+import csv
+import struct
+from pathlib import Path
+
+import numpy as np
+
+SENTENCE_END = (".", "!", "?")
+PAUSE = 0.35
+MIN_SCENE = 0.5
+
+MAGIC = b"TLDRTX1\0"
+HEADER = struct.Struct("<8sIII4x")
+
+
+class Transcript:
+    """Word timestamps held as parallel arrays, with a time index over them.
+
+    ``start`` and ``end`` are float32 seconds, ``word_ids`` index into the
+    interned ``vocab`` table. The binary ``.tlx`` layout is a fixed header
+    followed by the three arrays and the UTF-8 vocabulary, so :meth:`load`
+    can memory-map it without parsing anything. Lookups assume the words
+    are in time order, as Whisper returns them, and use binary search.
+    """
+
+    def __init__(self, start: np.ndarray, end: np.ndarray, word_ids: np.ndarray, vocab: list[str]):
+        self.start = start
+        self.end = end
+        self.word_ids = word_ids
+        self.vocab = vocab
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @classmethod
+    def from_words(cls, words: list[dict]) -> "Transcript":
+        index: dict[str, int] = {}
+        ids = [index.setdefault(w["word"], len(index)) for w in words]
+        return cls(
+            np.array([w["start"] for w in words], dtype=np.float32),
+            np.array([w["end"] for w in words], dtype=np.float32),
+            np.array(ids, dtype=np.uint32),
+            list(index),
+        )
+
+    @classmethod
+    def from_csv(cls, path: str | Path) -> "Transcript":
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        return cls.from_words([{"word": r["word"], "start": float(r["start"]), "end": float(r["end"])} for r in rows])
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Transcript":
+        """Open a ``.tlx`` file memory-mapped, or parse a step 3 CSV export."""
+        path = Path(path)
+        if path.suffix == ".csv":
+            return cls.from_csv(path)
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, n_words, n_vocab, blob_len = HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a transcript file")
+        pos = HEADER.size
+
+        def take(dtype, count):
+            nonlocal pos
+            arr = buf[pos:pos + count * np.dtype(dtype).itemsize].view(dtype)
+            pos += arr.nbytes
+            return arr
+
+        start, end = take(np.float32, n_words), take(np.float32, n_words)
+        word_ids = take(np.uint32, n_words)
+        offsets = take(np.uint32, n_vocab + 1)
+        blob = bytes(buf[pos:pos + blob_len])
+        vocab = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n_vocab)]
+        return cls(start, end, word_ids, vocab)
+
+    def save(self, path: str | Path) -> Path:
+        encoded = [w.encode("utf-8") for w in self.vocab]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum([len(w) for w in encoded])
+        blob = b"".join(encoded)
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self), len(self.vocab), len(blob)))
+            for arr in (self.start, self.end, self.word_ids, offsets):
+                f.write(np.ascontiguousarray(arr).tobytes())
+            f.write(blob)
+        return Path(path)
+
+    def to_csv(self, path: str | Path) -> Path:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["word", "start", "end"])
+            # float32 seconds, rounded back to the millisecond precision Whisper reports.
+            start = np.round(self.start.astype(np.float64), 3).tolist()
+            end = np.round(self.end.astype(np.float64), 3).tolist()
+            writer.writerows(zip(self.words(), start, end))
+        return Path(path)
+
+    def words(self, lo: int = 0, hi: int | None = None) -> list[str]:
+        return [self.vocab[i] for i in self.word_ids[lo:hi]]
+
+    def word_at(self, t: float) -> int | None:
+        """Index of the word being spoken at time ``t``, or None during silence."""
+        i = int(np.searchsorted(self.start, t, side="right")) - 1
+        return i if i >= 0 and t < self.end[i] else None
+
+    def words_between(self, t0: float, t1: float) -> range:
+        """Indices of the words overlapping ``[t0, t1)``."""
+        lo = int(np.searchsorted(self.end, t0, side="right"))
+        hi = int(np.searchsorted(self.start, t1, side="left"))
+        return range(lo, max(lo, hi))
+
+    def break_mask(self, pause: float = PAUSE) -> np.ndarray:
+        """True for each word (except the last) that ends a sentence.
+
+        Whisper's word timestamps usually drop punctuation, so a pause of at
+        least ``pause`` seconds also counts as a sentence break. Punctuation
+        is checked once per vocabulary entry, not once per word.
+        """
+        if len(self) < 2:
+            return np.zeros(0, dtype=bool)
+        vocab = np.char.rstrip(np.char.strip(np.array(self.vocab, dtype=str)), "\"')]")
+        punctuated = np.zeros(len(vocab), dtype=bool)
+        for mark in SENTENCE_END:
+            punctuated |= np.char.endswith(vocab, mark)
+        gaps = self.start[1:] - self.end[:-1]
+        return punctuated[self.word_ids[:-1]] | (gaps >= pause)
+
+    def sentence_breaks(self, pause: float = PAUSE) -> np.ndarray:
+        """Times between sentences, placed in the middle of the silence after each one."""
+        end, start = self.end[:-1].astype(np.float64), self.start[1:].astype(np.float64)
+        return ((end + np.maximum(start, end)) / 2)[self.break_mask(pause)]
+
+    def sentence_spans(self, pause: float = PAUSE) -> list[range]:
+        """Word index ranges of each sentence."""
+        cuts = np.flatnonzero(self.break_mask(pause)) + 1
+        bounds = [0, *cuts.tolist(), len(self)]
+        return [range(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def scene_boundaries(n_scenes: int, breaks: np.ndarray, total: float) -> np.ndarray:
+    """Split ``[0, total]`` into ``n_scenes`` spans, cutting at the sentence breaks nearest an even split.
+
+    Returns ``n_scenes + 1`` increasing times from 0 to ``total``. Where two
+    scenes would snap to the same break, the later one keeps the even-split
+    time so every scene stays non-empty.
+    """
+    targets = total * np.arange(1, n_scenes) / n_scenes
+    cuts = targets.copy()
+    if len(breaks):
+        idx = np.clip(np.searchsorted(breaks, targets), 1, len(breaks)) - 1
+        right = np.minimum(idx + 1, len(breaks) - 1)
+        nearest = np.where(np.abs(breaks[right] - targets) < np.abs(breaks[idx] - targets), right, idx)
+        unique = np.concatenate(([True], nearest[1:] != nearest[:-1]))
+        cuts = np.where(unique, breaks[nearest], targets)
+        cuts = np.maximum.accumulate(cuts)
+    bounds = np.concatenate(([0.0], cuts, [total]))
+    # Keep every scene at least MIN_SCENE long even where breaks cluster:
+    # shift by k * MIN_SCENE, force monotonic from both ends, shift back.
+    step = np.arange(n_scenes + 1) * min(MIN_SCENE, total / max(n_scenes, 1))
+    bounds = np.maximum.accumulate(bounds - step) + step
+    tail = step[::-1]
+    return np.minimum.accumulate((bounds + tail)[::-1])[::-1] - tail
+
+
+def scene_durations(path: str | Path, n_scenes: int, total: float | None = None) -> list[float]:
+    """Per-scene durations that follow the narration in the step 3 transcript.
+
+    ``path`` may be the ``.tlx`` store or the CSV export. ``total`` is the
+    narration length; it defaults to the end of the last word so the video
+    never runs past the speech.
+    """
+    transcript = Transcript.load(path)
+    if total is None:
+        total = float(transcript.end[-1]) if len(transcript) else 0.0
+    bounds = scene_boundaries(n_scenes, transcript.sentence_breaks(), total)
+    return np.diff(bounds).tolist()
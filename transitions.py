@@ -0,0 +1,68 @@
+from dataclasses import dataclass
+
+# ffmpeg xfade transitions offered between scenes; "cut" is a hard cut.
+KINDS = [
+    "cut", "fade", "fadeblack", "fadewhite", "dissolve",
+    "wipeleft", "wiperight", "wipeup", "wipedown", "slideleft", "slideright", "circleopen",
+]
+SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class Transition:
+    """How a scene gives way to the next one: an xfade ``kind`` lasting ``seconds``."""
+
+    kind: str = "cut"
+    seconds: float = 0.0
+
+
+def plan_transitions(specs: list[str], n_scenes: int, seconds: float = SECONDS) -> list[Transition]:
+    """The transitions between ``n_scenes`` scenes, cycling through ``specs``.
+
+    Each spec is a kind, optionally with its own length as
+    ``kind:seconds``; the others last ``seconds``.
+    """
+    cycle = []
+    for spec in specs:
+        kind, _, length = spec.partition(":")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown transition {kind!r}; choose from {', '.join(KINDS)}")
+        try:
+            length = float(length) if length else seconds
+        except ValueError:
+            raise ValueError(f"Bad transition length in {spec!r}; expected kind:seconds") from None
+        if length < 0:
+            raise ValueError(f"Transition length in {spec!r} can't be negative")
+        cycle.append(Transition(kind, 0.0 if kind == "cut" else length))
+    if not cycle:
+        raise ValueError("No transitions given")
+    return [cycle[i % len(cycle)] for i in range(max(0, n_scenes - 1))]
+
+
+def scene_fades(transitions: list[Transition], bounds: list[int], fps: int) -> list[tuple[str, int]]:
+    """The xfade transition into each scene and how many frames it overlaps the previous one.
+
+    ``bounds`` are the scene start frames from ``render.frame_boundaries``.
+    A fade into scene ``i`` plays over the last frames of scene ``i - 1``,
+    so every scene is fully on screen from its own start frame and the
+    video keeps its length. It takes at most half of scene ``i - 1``,
+    which leaves that scene fully on screen for at least the other half,
+    and no more than the whole of scene ``i``. The first scene has
+    nothing to fade from.
+    """
+    frames = [bounds[i + 1] - bounds[i] for i in range(len(bounds) - 1)]
+    fades = [("fade", 0)]
+    for i, t in enumerate(transitions[:len(frames) - 1], start=1):
+        length = 0 if t.kind == "cut" else min(round(t.seconds * fps), frames[i - 1] // 2, frames[i])
+        # A zero-length xfade is a hard cut, whatever its kind.
+        fades.append((t.kind if length else "fade", length))
+    return fades
+
+
+def clip_starts(bounds: list[int], fades: list[tuple[str, int]]) -> list[int]:
+    """Frame at which each scene's clip starts, i.e. the xfade offsets, given the ``fades`` into each scene.
+
+    The clip of scene ``i`` runs from here to ``bounds[i + 1]``. A fade into
+    the first scene (a segment continuing an earlier one) starts before 0.
+    """
+    return [bounds[i] - frames for i, (_, frames) in enumerate(fades)]
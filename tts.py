@@ -0,0 +1,122 @@
+import contextvars
+import re
+import subprocess
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+import api_cache
+from render import ffmpeg_exe, run_ffmpeg
+
+MODEL = "gpt-4o-mini-tts"
+VOICE = "coral"
+SPEED = 0.95
+MAX_CHARS = 400
+# A chunk ends after about one sentence in this many, so chunks average a few sentences.
+BOUNDARY_EVERY = 3
+MAX_IN_FLIGHT = 4
+
+_SENTENCE = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+_PARAGRAPH = re.compile(r"\n\s*\n")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE.split(text.strip()) if s.strip()]
+
+
+def ends_chunk(sentence: str, every: int = BOUNDARY_EVERY) -> bool:
+    """Whether ``sentence`` closes its chunk, decided by its text alone (about one in ``every``)."""
+    return zlib.crc32(sentence.encode("utf-8")) % every == 0
+
+
+def chunk_text(text: str, max_chars: int = MAX_CHARS) -> list[str]:
+    """Group whole sentences into chunks of at most ``max_chars``.
+
+    Paragraphs (split on blank lines) never share a chunk. Within one, a
+    chunk ends after a sentence that :func:`ends_chunk` picks, or early
+    when the next sentence would not fit; a single sentence longer than
+    the limit is split on whitespace. Since the picked sentences depend
+    only on their own text, an edit moves boundaries only up to the next
+    picked sentence: editing one paragraph leaves the other paragraphs'
+    chunks (and their cache keys) alone, and usually most of its own.
+    """
+    chunks = []
+    for paragraph in _PARAGRAPH.split(text):
+        current = ""
+        for sentence in split_sentences(paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current} {sentence}".strip()
+            if ends_chunk(sentence):
+                chunks.append(current)
+                current = ""
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+def audio_format(path: Path) -> tuple[int, str]:
+    """Sample rate and channel layout of an audio file, as reported by ffmpeg."""
+    proc = subprocess.run([ffmpeg_exe(), "-hide_banner", "-i", str(path)], capture_output=True, text=True)
+    match = re.search(r"Audio: [^,]+, (\d+) Hz, (\w+)", proc.stderr)
+    return (int(match.group(1)), match.group(2)) if match else (24000, "mono")
+
+
+def synthesize_chunked(
+    text: str,
+    out_path: Path,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    gap: float = 0.0,
+    max_chars: int = MAX_CHARS,
+    on_chunk: Callable[[int, int, Path], None] | None = None,
+) -> Path:
+    """Synthesise ``text`` sentence-chunk by chunk, concurrently, into one MP3.
+
+    Each chunk goes through the API cache keyed by its own text, so only
+    edited chunks are re-synthesised. ``on_chunk(i, n, path)`` is called
+    from the calling thread in narration order as soon as chunk ``i`` and
+    all chunks before it are ready, so playback can start before the rest
+    finish. The chunks are joined without re-encoding, with ``gap``
+    seconds of silence between them.
+    """
+    chunks = chunk_text(text, max_chars)
+    if not chunks:
+        raise ValueError("No text to synthesise")
+    with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max(1, max_in_flight)) as pool:
+        tmp = Path(tmp)
+        futures = [
+            pool.submit(contextvars.copy_context().run, api_cache.speech, MODEL, VOICE, chunk, speed=SPEED)
+            for chunk in chunks
+        ]
+        parts = []
+        silence = None
+        for i, fut in enumerate(futures):
+            part = tmp / f"chunk_{i:04d}.mp3"
+            part.write_bytes(fut.result())
+            if on_chunk:
+                on_chunk(i, len(chunks), part)
+            if gap > 0 and parts:
+                if silence is None:
+                    rate, layout = audio_format(part)
+                    silence = tmp / "gap.mp3"
+                    run_ffmpeg([
+                        "-f", "lavfi", "-i", f"anullsrc=r={rate}:cl={layout}",
+                        "-t", f"{gap:.3f}", "-c:a", "libmp3lame", str(silence),
+                    ])
+                parts.append(silence)
+            parts.append(part)
+        list_file = tmp / "parts.txt"
+        list_file.write_text("".join(f"file '{p.as_posix()}'\n" for p in parts))
+        run_ffmpeg(["-f", "concat", "-safe", "0", "-i", str(list_file), "-c", "copy", str(out_path)])
+    return out_path